@@ -1,8 +1,10 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 
-db = SQLAlchemy()
+from app.routing import RoutingSession, configure_replica
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 
 
@@ -10,9 +12,18 @@ def create_app(config_class='config.Config'):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    from app.db_tuning import engine_options, tune_engine, ensure_indexes
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    configure_replica(app)
+    
     db.init_app(app)
     bcrypt.init_app(app)
     
+    with app.app_context():
+        for engine in db.engines.values():
+            tune_engine(engine, app.config)
+    
     from app.routes.auth import auth_bp
     from app.routes.user import user_bp
     from app.routes.admin import admin_bp
@@ -25,5 +36,33 @@ def create_app(config_class='config.Config'):
     
     with app.app_context():
         db.create_all()
+        ensure_indexes(db.engine, db.metadata)
+    
+    from app.caching import collection_versions, response_cache
+    from app.hashing import hashing_pool, HashingBusy
+    from app.login_cache import negative_login_cache
+    from app.metrics import init_metrics
+    from app.permissions import permission_index
+    from app.rate_limit import rate_limiter, check_rate_limits
+    from app.reaper import start_session_reaper
+    from app.session_cache import session_cache
+    from app.session_store import init_session_store
+    hashing_pool.configure(app.config)
+    permission_index.reset()
+    rate_limiter.configure(app.config)
+    collection_versions.clear()
+    response_cache.configure(app.config)
+    session_cache.configure(app.config)
+    negative_login_cache.configure(app.config)
+    init_session_store(app)
+    start_session_reaper(app)
+    init_metrics(app)
+    app.before_request(check_rate_limits)
+    
+    @app.errorhandler(HashingBusy)
+    def hashing_busy(error):
+        response = jsonify({'error': 'Сервер перегружен, повторите попытку позже'})
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
     
     return app
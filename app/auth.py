@@ -1,72 +1,213 @@
 from functools import wraps
-from flask import request, jsonify, session
+from flask import request, jsonify, session, g, current_app
 from datetime import datetime, timedelta
+from threading import Lock
 import secrets
+import time
 
 from app import db, bcrypt
-from app.models import User, UserSession
+from app.caching import collection_versions
+from app.hashing import hashing_pool, hash_cost
+from app.login_cache import negative_login_cache
+from app.metrics import timed_stage
+from app.models import User, SessionEpoch
+from app.permissions import permission_index
+from app.rate_limit import rate_limiter
+from app.routing import replica_reads, replica_enabled
+from app.session_cache import session_cache
+from app.session_store import get_session_store, bump_session_epoch
 
 
+@timed_stage('bcrypt')
 def hash_password(password):
-    return bcrypt.generate_password_hash(password).decode('utf-8')
+    return hashing_pool.run(bcrypt.generate_password_hash, password).decode('utf-8')
 
 
+@timed_stage('bcrypt')
 def verify_password(password_hash, password):
-    return bcrypt.check_password_hash(password_hash, password)
+    return hashing_pool.run(bcrypt.check_password_hash, password_hash, password)
 
 
-def create_session_token():
-    return secrets.token_urlsafe(32)
+_dummy_hashes = {}
+
+
+def verify_dummy_password(password):
+    cost = current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+    dummy_hash = _dummy_hashes.get(cost)
+    if dummy_hash is None:
+        dummy_hash = _dummy_hashes.setdefault(cost, hash_password(secrets.token_urlsafe(16)))
+    verify_password(dummy_hash, password)
+    return False
+
+
+def needs_rehash(password_hash):
+    return hash_cost(password_hash) != current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+
+
+def schedule_rehash(user_id, password_hash, password):
+    app = current_app._get_current_object()
+    
+    def rehash():
+        new_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        with app.app_context():
+            User.query.filter_by(id=user_id, password_hash=password_hash).update(
+                {'password_hash': new_hash}
+            )
+            db.session.commit()
+    
+    return hashing_pool.submit_background(rehash)
 
 
 def create_user_session(user_id, expires_in_hours=1):
-    session_token = create_session_token()
     expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+    return get_session_store().create(user_id, expires_at)
+
+
+auth_stats = {
+    'resolved': 0,
+    'reused': 0,
+    'resolve_seconds': 0.0,
+}
+_auth_stats_lock = Lock()
+
+
+def get_auth_stats():
+    with _auth_stats_lock:
+        stats = dict(auth_stats)
+    stats['session_cache'] = session_cache.stats()
+    stats['hashing'] = hashing_pool.stats()
+    stats['rate_limit'] = rate_limiter.stats()
+    stats['negative_login_cache'] = negative_login_cache.stats()
+    return stats
+
+
+class Principal:
+    def __init__(self, user_id, session_token, user=None, role_ids=None):
+        self.user_id = user_id
+        self.session_token = session_token
+        self.role_ids = role_ids
+        self._user = user
+    
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = User.query.get(self.user_id)
+        return self._user
     
-    user_session = UserSession(
-        user_id=user_id,
-        session_token=session_token,
-        expires_at=expires_at
-    )
+    @timed_stage('permission')
+    def has_permission(self, resource_type, action):
+        if self.role_ids is not None:
+            return permission_index.roles_have_permission(self.role_ids, resource_type, action)
+        return self.user.has_permission(resource_type, action)
     
-    db.session.add(user_session)
-    db.session.commit()
+    def permissions(self):
+        if self.role_ids is not None:
+            return permission_index.permissions_for_roles(self.role_ids)
+        return self.user.effective_permissions()
     
-    return session_token
+    @timed_stage('permission')
+    def has_role(self, role_name):
+        if self.role_ids is not None:
+            return permission_index.roles_include(self.role_ids, role_name)
+        return self.user.has_role(role_name)
 
 
-def get_current_user():
+@timed_stage('auth')
+def get_current_principal():
     session_token = session.get('session_token')
     
     if not session_token:
         return None
     
-    user_session = UserSession.query.filter_by(
-        session_token=session_token,
-        is_active=True
+    cached = g.get('_principal')
+    if cached is not None and cached[0] == session_token:
+        with _auth_stats_lock:
+            auth_stats['reused'] += 1
+        return cached[1]
+    
+    started = time.perf_counter()
+    with replica_reads():
+        principal = _resolve_principal(session_token)
+    if principal is None and replica_enabled():
+        principal = _resolve_principal(session_token)
+    elapsed = time.perf_counter() - started
+    
+    with _auth_stats_lock:
+        auth_stats['resolved'] += 1
+        auth_stats['resolve_seconds'] += elapsed
+    
+    g._principal = (session_token, principal)
+    return principal
+
+
+def get_current_user():
+    principal = get_current_principal()
+    return principal.user if principal else None
+
+
+def forget_current_principal():
+    g.pop('_principal', None)
+
+
+def _resolve_principal(session_token):
+    store = get_session_store()
+    
+    if store.stateless:
+        claims = store.claims(session_token)
+        if claims is None:
+            return None
+        return Principal(claims['u'], session_token, role_ids=frozenset(claims['r']))
+    
+    cached = session_cache.get(session_token)
+    stored = None
+    
+    if cached is None:
+        stored = store.get(session_token)
+        if not stored:
+            return None
+    
+    user_id = cached[0] if cached is not None else stored[0]
+    
+    # Эпоха сессий читается тем же запросом, что и пользователь: если другой процесс отозвал
+    # токены пользователя, закешированная запись перепроверяется в хранилище
+    row = db.session.execute(
+        db.select(User, SessionEpoch.epoch)
+        .outerjoin(SessionEpoch, SessionEpoch.user_id == User.id)
+        .where(User.id == user_id)
     ).first()
     
-    if not user_session:
+    if row is None:
         return None
     
-    if user_session.expires_at < datetime.utcnow():
-        user_session.is_active = False
-        db.session.commit()
-        return None
+    user, epoch = row[0], row[1] or 0
+    
+    if cached is not None and cached[1] != epoch:
+        session_cache.evict(session_token)
+        stored = store.get(session_token)
+        if not stored:
+            return None
     
-    user = User.query.get(user_session.user_id)
+    if stored is not None and session_cache.maxsize > 0:
+        # При промахе токен прочитан до эпохи: отзыв, закоммиченный между этими чтениями, попал бы
+        # в кеш под новой эпохой. Отзыв сначала гасит токен в хранилище, потом меняет эпоху,
+        # поэтому повторная проверка после чтения эпохи его увидит
+        if cached is None:
+            stored = store.get(session_token)
+            if not stored:
+                return None
+        session_cache.put(session_token, user_id, stored[1], epoch)
     
-    if not user or not user.is_active:
+    if not user.is_active:
         return None
     
-    return user
+    return Principal(user.id, session_token, user=user)
 
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if user is None:
+        principal = get_current_principal()
+        if principal is None:
             return jsonify({'error': 'Unauthorized', 'message': 'Необходима авторизация'}), 401
         return f(*args, **kwargs)
     return decorated_function
@@ -76,11 +217,11 @@ def permission_required(resource_type, action):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            user = get_current_user()
-            if user is None:
+            principal = get_current_principal()
+            if principal is None:
                 return jsonify({'error': 'Unauthorized', 'message': 'Необходима авторизация'}), 401
             
-            if not user.has_permission(resource_type, action):
+            if not principal.has_permission(resource_type, action):
                 return jsonify({
                     'error': 'Forbidden', 
                     'message': f'Недостаточно прав для выполнения действия {action} над ресурсом {resource_type}'
@@ -95,11 +236,11 @@ def role_required(role_name):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            user = get_current_user()
-            if user is None:
+            principal = get_current_principal()
+            if principal is None:
                 return jsonify({'error': 'Unauthorized', 'message': 'Необходима авторизация'}), 401
             
-            if not user.has_role(role_name):
+            if not principal.has_role(role_name):
                 return jsonify({
                     'error': 'Forbidden', 
                     'message': f'Требуется роль {role_name}'
@@ -110,6 +251,34 @@ def role_required(role_name):
     return decorator
 
 
-def invalidate_user_sessions(user_id):
-    UserSession.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
-    db.session.commit()
+def invalidate_session(session_token):
+    store = get_session_store()
+    stored = None if store.stateless else store.get(session_token)
+    store.invalidate(session_token)
+    session_cache.evict(session_token)
+    if stored:
+        bump_session_epoch(stored[0])
+    forget_current_principal()
+
+
+def invalidate_user_sessions(user_id, except_token=None):
+    store = get_session_store()
+    store.invalidate_user(user_id, except_token=except_token)
+    session_cache.evict_user(user_id, except_token=except_token)
+    if not store.stateless:
+        bump_session_epoch(user_id)
+    forget_current_principal()
+    
+    if except_token and store.get(except_token) is None:
+        session['session_token'] = create_user_session(user_id)
+
+
+def refresh_user_authorization(*user_ids):
+    store = get_session_store()
+    for user_id in user_ids:
+        permission_index.invalidate_user(user_id)
+        if store.stateless:
+            store.invalidate_user(user_id)
+    
+    if user_ids:
+        collection_versions.bump('user_roles')
@@ -0,0 +1,162 @@
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import io
+import json
+import os
+import time
+
+import bcrypt as _bcrypt
+
+from app import db
+from app.caching import collection_versions
+from app.models import User, Role, user_roles
+
+REQUIRED_FIELDS = ('email', 'password', 'first_name', 'last_name')
+
+
+def _hash_password(args):
+    password, cost = args
+    return _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds=cost)).decode('utf-8')
+
+
+def parse_records(stream, fmt):
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield row
+    elif fmt == 'ndjson':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Битая строка не останавливает импорт: import_users посчитает ее в skipped_invalid
+                yield None
+    else:
+        raise ValueError(f'Unknown import format: {fmt}')
+
+
+def detect_format(filename):
+    return 'csv' if filename.lower().endswith('.csv') else 'ndjson'
+
+
+def _is_valid(record):
+    if not isinstance(record, dict):
+        return False
+    
+    if any(not isinstance(record.get(field), str) or not record[field] for field in REQUIRED_FIELDS):
+        return False
+    
+    if not isinstance(record.get('middle_name') or '', str):
+        return False
+    
+    roles = record.get('roles') or ''
+    if not isinstance(roles, str) and not (isinstance(roles, list) and all(isinstance(name, str) for name in roles)):
+        return False
+    
+    return len(record['password']) >= 6
+
+
+def _role_names(record, default_role):
+    roles = record.get('roles')
+    if not roles:
+        return [default_role] if default_role else []
+    if isinstance(roles, str):
+        roles = roles.replace(';', ',').split(',')
+    return [name.strip() for name in roles if name.strip()]
+
+
+def import_users(records, cost, batch_size=1000, workers=None, default_role='user', progress=None):
+    stats = {'imported': 0, 'skipped_existing': 0, 'skipped_invalid': 0, 'batches': 0}
+    started = time.perf_counter()
+    
+    existing_emails = set(db.session.execute(db.select(User.email)).scalars())
+    role_ids = dict(db.session.execute(db.select(Role.name, Role.id)).all())
+    
+    workers = os.cpu_count() if workers is None else workers
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    
+    def flush(batch):
+        if not batch:
+            return
+        
+        jobs = [(record['password'], cost) for record in batch]
+        if executor is not None:
+            hashes = list(executor.map(_hash_password, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+        else:
+            hashes = [_hash_password(job) for job in jobs]
+        
+        try:
+            inserted = db.session.execute(
+                db.insert(User).returning(User.id, User.email),
+                [{
+                    'email': record['email'],
+                    'password_hash': password_hash,
+                    'first_name': record['first_name'],
+                    'last_name': record['last_name'],
+                    'middle_name': record.get('middle_name') or None,
+                } for record, password_hash in zip(batch, hashes)]
+            ).all()
+            
+            user_ids = {email: user_id for user_id, email in inserted}
+            links = [
+                {'user_id': user_ids[record['email']], 'role_id': role_ids[name]}
+                for record in batch
+                for name in dict.fromkeys(_role_names(record, default_role))
+                if name in role_ids
+            ]
+            if links:
+                db.session.execute(db.insert(user_roles), links)
+            
+            db.session.commit()
+            collection_versions.bump('users')
+        except Exception:
+            db.session.rollback()
+            for record in batch:
+                existing_emails.discard(record['email'])
+            raise
+        
+        stats['imported'] += len(batch)
+        stats['batches'] += 1
+        if progress:
+            progress(stats)
+    
+    try:
+        batch = []
+        for record in records:
+            if not _is_valid(record):
+                stats['skipped_invalid'] += 1
+                continue
+            
+            if record['email'] in existing_emails:
+                stats['skipped_existing'] += 1
+                continue
+            
+            existing_emails.add(record['email'])
+            batch.append(record)
+            
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        
+        flush(batch)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    stats['seconds'] = time.perf_counter() - started
+    stats['users_per_second'] = stats['imported'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def records_from_request(request):
+    if request.is_json:
+        data = request.get_json()
+        records = data.get('users', []) if isinstance(data, dict) else data
+        if not isinstance(records, list):
+            raise ValueError('Import payload must be a list of records')
+        return records
+    
+    fmt = 'csv' if 'csv' in (request.mimetype or '') else 'ndjson'
+    return parse_records(io.StringIO(request.get_data(as_text=True)), fmt)
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from functools import wraps
+from threading import Lock
+from urllib.parse import urlencode
+import hashlib
+import time
+
+from flask import Response, current_app, g, request, make_response
+
+from app import db
+from app.models import CollectionVersion
+
+
+class CollectionVersions:
+    def __init__(self):
+        self._lock = Lock()
+        self._versions = {}
+    
+    def get(self, name):
+        cached = self._versions.get(name)
+        ttl = current_app.config.get('COLLECTION_VERSION_TTL', 2)
+        if cached is not None and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+        
+        row = db.session.get(CollectionVersion, name)
+        version = row.version if row else 0
+        with self._lock:
+            self._versions[name] = (version, time.monotonic())
+        return version
+    
+    def bump(self, *names):
+        for name in names:
+            updated = CollectionVersion.query.filter_by(name=name).update(
+                {'version': CollectionVersion.version + 1}
+            )
+            if not updated:
+                db.session.add(CollectionVersion(name=name, version=1))
+        db.session.commit()
+        
+        with self._lock:
+            for name in names:
+                self._versions.pop(name, None)
+        
+        for name in names:
+            response_cache.evict_collection(name)
+    
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+
+
+class ResponseCache:
+    def __init__(self, maxsize=1024, max_bytes=64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def configure(self, config):
+        self.maxsize = config.get('RESPONSE_CACHE_SIZE', self.maxsize)
+        self.max_bytes = config.get('RESPONSE_CACHE_MAX_BYTES', self.max_bytes)
+        self.clear()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+    
+    def put(self, key, body, mimetype):
+        if self.maxsize <= 0 or len(body) > self.max_bytes:
+            return
+        
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (body, mimetype)
+            self._bytes += len(body)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+    
+    def evict_collection(self, collection):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == collection]:
+                self._remove(key)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries), bytes=self._bytes)
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+
+collection_versions = CollectionVersions()
+response_cache = ResponseCache()
+
+
+def _scope_key(principal):
+    from app.permissions import permission_index
+    
+    role_ids = principal.role_ids
+    if role_ids is None:
+        role_ids = permission_index.role_ids_for(principal.user_id)
+    return ','.join(map(str, sorted(role_ids)))
+
+
+def collection_etag(collection, principal, params=()):
+    cached = g.get('_collection_etag')
+    if cached is not None and cached[0] == collection:
+        return cached[1]
+    
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(_scope_key(principal).encode())
+    digest.update(b'?')
+    # Только параметры, которые читает endpoint: лишние (например, для обхода кеша) не плодят записи
+    digest.update(urlencode([(name, request.args[name]) for name in params if name in request.args]).encode())
+    etag = f'{collection}-{collection_versions.get(collection)}-{digest.hexdigest()}'
+    g._collection_etag = (collection, etag)
+    return etag
+
+
+def conditional_get(collection, params=()):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            from app.auth import get_current_principal
+            
+            etag = collection_etag(collection, get_current_principal(), params)
+            
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Cookie')
+            return response
+        return decorated_function
+    return decorator
+
+
+def cached_response(collection, params=()):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            from app.auth import get_current_principal
+            
+            key = (collection, request.endpoint, collection_etag(collection, get_current_principal(), params))
+            
+            cached = response_cache.get(key)
+            if cached is not None:
+                body, mimetype = cached
+                return Response(body, status=200, mimetype=mimetype)
+            
+            # Принципал уже разрешен (в том числе через реплику) - учитываются только чтения самого обработчика
+            g.pop('_read_from_replica', None)
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed and not g.get('_read_from_replica'):
+                response_cache.put(key, response.get_data(), response.mimetype)
+            return response
+        return decorated_function
+    return decorator
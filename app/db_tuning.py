@@ -0,0 +1,65 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex
+
+
+def engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    
+    if config.get('DB_PROFILE') != 'performance':
+        return {}
+    
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}
+        return {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': 10,
+            'connect_args': {
+                'timeout': config.get('SQLITE_BUSY_TIMEOUT', 5000) / 1000,
+                'check_same_thread': False,
+            },
+        }
+    
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+
+
+def sqlite_pragmas(config):
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT', 5000),
+        'cache_size': -config.get('SQLITE_CACHE_SIZE_KB', 65536),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'temp_store': 'MEMORY',
+    }
+
+
+def tune_engine(engine, config):
+    if config.get('DB_PROFILE') != 'performance' or engine.dialect.name != 'sqlite':
+        return
+    
+    pragmas = sqlite_pragmas(config)
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def ensure_indexes(engine, metadata):
+    # create_all пропускает уже существующие таблицы вместе с их индексами,
+    # поэтому индексы, добавленные в модели позже, досоздаются отдельно
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
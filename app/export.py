@@ -0,0 +1,79 @@
+import json
+import zlib
+
+from app import db
+from app.models import User, Role, UserSession, user_roles, role_permissions
+
+
+def _ndjson(kind, data):
+    return json.dumps({'type': kind, 'data': data}, ensure_ascii=False) + '\n'
+
+
+def _stream(statement, batch_size):
+    result = db.session.execute(
+        statement.execution_options(yield_per=batch_size, stream_results=True)
+    )
+    for partition in result.partitions():
+        yield from partition
+
+
+def iter_export_lines(batch_size=1000):
+    role_permission_ids = {}
+    for role_id, permission_id in db.session.execute(
+        db.select(role_permissions.c.role_id, role_permissions.c.permission_id)
+    ):
+        role_permission_ids.setdefault(role_id, []).append(permission_id)
+    
+    for (role,) in _stream(db.select(Role).order_by(Role.id), batch_size):
+        data = role.to_dict()
+        data['permission_ids'] = role_permission_ids.get(role.id, [])
+        yield _ndjson('role', data)
+    db.session.expunge_all()
+    
+    current_user_id, current_role_ids = None, []
+    for row in _stream(
+        db.select(User.id, User.email, User.first_name, User.last_name, User.middle_name,
+                  User.is_active, User.created_at, user_roles.c.role_id)
+        .outerjoin(user_roles, user_roles.c.user_id == User.id)
+        .order_by(User.id),
+        batch_size
+    ):
+        if row.id != current_user_id:
+            if current_user_id is not None:
+                yield _ndjson('user', user_data)
+            current_user_id, current_role_ids = row.id, []
+            user_data = {
+                'id': row.id,
+                'email': row.email,
+                'first_name': row.first_name,
+                'last_name': row.last_name,
+                'middle_name': row.middle_name,
+                'is_active': row.is_active,
+                'created_at': row.created_at.isoformat() if row.created_at else None,
+                'role_ids': current_role_ids,
+            }
+        if row.role_id is not None:
+            current_role_ids.append(row.role_id)
+    if current_user_id is not None:
+        yield _ndjson('user', user_data)
+    
+    for (user_session,) in _stream(db.select(UserSession).order_by(UserSession.id), batch_size):
+        yield _ndjson('session', user_session.to_dict())
+        db.session.expunge(user_session)
+
+
+def iter_gzip(lines, chunk_size=64 * 1024):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    buffer = []
+    buffered = 0
+    
+    for line in lines:
+        buffer.append(line.encode('utf-8'))
+        buffered += len(buffer[-1])
+        if buffered >= chunk_size:
+            chunk = compressor.compress(b''.join(buffer))
+            buffer, buffered = [], 0
+            if chunk:
+                yield chunk
+    
+    yield compressor.compress(b''.join(buffer)) + compressor.flush()
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+import os
+import time
+
+
+class HashingBusy(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Hashing pool is saturated')
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = Lock()
+        self.queue_timeout = 0.5
+        self.retry_after = 1
+        self._stats = {
+            'in_flight': 0,
+            'completed': 0,
+            'rejected': 0,
+            'hash_seconds_total': 0.0,
+            'hash_seconds_max': 0.0,
+        }
+    
+    def configure(self, config):
+        self.shutdown()
+        
+        workers = config.get('HASHING_WORKERS')
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        self.queue_timeout = config.get('HASHING_QUEUE_TIMEOUT', 0.5)
+        self.retry_after = config.get('HASHING_RETRY_AFTER', 1)
+        
+        if workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+            self._slots = BoundedSemaphore(workers + config.get('HASHING_QUEUE_SIZE', 32))
+    
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = None
+        self._slots = None
+    
+    def run(self, fn, *args):
+        if self._executor is None:
+            return self._timed(fn, *args)
+        
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise HashingBusy(self.retry_after)
+        
+        with self._lock:
+            self._stats['in_flight'] += 1
+        try:
+            return self._executor.submit(self._timed, fn, *args).result()
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+            slots.release()
+    
+    def submit_background(self, fn, *args):
+        if self._executor is None:
+            fn(*args)
+            return True
+        
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            return False
+        
+        def task():
+            try:
+                self._timed(fn, *args)
+            finally:
+                slots.release()
+        
+        self._executor.submit(task)
+        return True
+    
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stats['completed'] += 1
+                self._stats['hash_seconds_total'] += elapsed
+                self._stats['hash_seconds_max'] = max(self._stats['hash_seconds_max'], elapsed)
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+hashing_pool = HashingPool()
+
+
+def hash_cost(password_hash):
+    try:
+        return int(password_hash.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def calibrate_cost(target_seconds, min_cost=4, max_cost=16, password='calibration-password'):
+    import bcrypt as _bcrypt
+    
+    timings = {}
+    chosen = min_cost
+    for cost in range(min_cost, max_cost + 1):
+        started = time.perf_counter()
+        _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds=cost))
+        timings[cost] = time.perf_counter() - started
+        
+        if timings[cost] > target_seconds:
+            break
+        chosen = cost
+    
+    return chosen, timings
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+
+UNKNOWN = 'unknown'
+INACTIVE = 'inactive'
+
+
+class NegativeLoginCache:
+    def __init__(self, maxsize=50000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+    
+    def configure(self, config):
+        self.maxsize = config.get('NEGATIVE_LOGIN_CACHE_SIZE', self.maxsize)
+        self.ttl = config.get('NEGATIVE_LOGIN_CACHE_TTL', self.ttl)
+        self.clear()
+    
+    def get(self, email, version=0):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            
+            reason, cached_version, cached_at = entry
+            if cached_version != version or time.monotonic() - cached_at > self.ttl:
+                del self._entries[email]
+                self._stats['evictions'] += 1
+                self._stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(email)
+            self._stats['hits'] += 1
+            return reason
+    
+    def put(self, email, reason, version=0):
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._entries.pop(email, None)
+            self._entries[email] = (reason, version, time.monotonic())
+            
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+    
+    def evict(self, *emails):
+        with self._lock:
+            for email in emails:
+                if self._entries.pop(email, None) is not None:
+                    self._stats['invalidations'] += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+
+negative_login_cache = NegativeLoginCache()
@@ -0,0 +1,251 @@
+from bisect import bisect_left
+from functools import wraps
+from threading import Lock
+import time
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+STAGES = ('auth', 'permission', 'bcrypt', 'json')
+STATS_GAUGES = ('size', 'bytes', 'keys', 'in_flight', 'hash_seconds_max')
+# Вложенные словари статистики, ключи которых - значения метки, а не имена метрик
+STATS_LABELS = {'auth_rate_limit_rejected': 'scope'}
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._series = {}
+    
+    def inc(self, *labels, amount=1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for labels, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+    
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = bound if bound == '+Inf' else _format_value(bound)
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(self.labelnames, labels, [("le", le)])} {cumulative}'
+                )
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self._lock = Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.requests = Counter(
+                'http_requests_total', 'Handled requests', ('method', 'endpoint', 'status')
+            )
+            self.request_duration = Histogram(
+                'http_request_duration_seconds', 'Request handling time', TIME_BUCKETS,
+                ('method', 'endpoint')
+            )
+            self.db_queries = Histogram(
+                'db_queries_per_request', 'SQL statements executed per request', COUNT_BUCKETS,
+                ('endpoint',)
+            )
+            self.db_time = Histogram(
+                'db_time_seconds_per_request', 'Time spent in SQL per request', TIME_BUCKETS,
+                ('endpoint',)
+            )
+            self.stage_time = Histogram(
+                'request_stage_seconds', 'Time spent in auth, permission, bcrypt and json stages per request',
+                TIME_BUCKETS, ('stage', 'endpoint')
+            )
+    
+    def observe_request(self, method, endpoint, status, duration, queries, timings):
+        with self._lock:
+            self.requests.inc(method, endpoint, str(status))
+            self.request_duration.observe(duration, method, endpoint)
+            self.db_queries.observe(queries, endpoint)
+            self.db_time.observe(timings['db'], endpoint)
+            for stage in STAGES:
+                if timings[stage]:
+                    self.stage_time.observe(timings[stage], stage, endpoint)
+    
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.request_duration, self.db_queries, self.db_time, self.stage_time):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def record_stage(stage, seconds):
+    if has_request_context():
+        timings = g.get('_timings')
+        if timings is not None:
+            timings[stage] += seconds
+
+
+def timed_stage(stage):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not metrics.enabled:
+                return f(*args, **kwargs)
+            
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - started)
+        return decorated_function
+    return decorator
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            record_stage('json', time.perf_counter() - started)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_started', None)
+    if started is None or not has_request_context():
+        return
+    
+    timings = g.get('_timings')
+    if timings is not None:
+        timings['db'] += time.perf_counter() - started
+        g._queries += 1
+
+
+def _start_request():
+    g._request_started = time.perf_counter()
+    g._timings = dict.fromkeys(STAGES + ('db',), 0.0)
+    g._queries = 0
+
+
+def _finish_request(response):
+    timings = g.get('_timings')
+    if timings is None or request.endpoint == 'metrics':
+        return response
+    
+    duration = time.perf_counter() - g._request_started
+    endpoint = request.endpoint or 'unmatched'
+    metrics.observe_request(request.method, endpoint, response.status_code, duration, g._queries, timings)
+    
+    if current_app.config.get('METRICS_SERVER_TIMING', True):
+        entries = [f'db;dur={timings["db"] * 1000:.3f};desc="{g._queries} queries"']
+        entries.extend(
+            f'{stage};dur={timings[stage] * 1000:.3f}' for stage in STAGES if timings[stage]
+        )
+        entries.append(f'total;dur={duration * 1000:.3f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+    
+    return response
+
+
+def render_stats(prefix, stats):
+    lines = []
+    for key, value in stats.items():
+        name = f'{prefix}_{key}'
+        if isinstance(value, dict) and name not in STATS_LABELS:
+            lines.extend(render_stats(name, value))
+            continue
+        
+        metric = name
+        if key in STATS_GAUGES:
+            lines.append(f'# TYPE {metric} gauge')
+        else:
+            metric = name if name.endswith('_total') else f'{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+        
+        if isinstance(value, dict):
+            labelnames = (STATS_LABELS[name],)
+            for label_value, count in sorted(value.items()):
+                lines.append(f'{metric}{_format_labels(labelnames, (label_value,))} {_format_value(count)}')
+        else:
+            lines.append(f'{metric} {_format_value(value)}')
+    return lines
+
+
+def _metrics_view():
+    from app.auth import get_auth_stats
+    from app.caching import response_cache
+    
+    if not current_app.config.get('METRICS_ALLOW_REMOTE') and request.remote_addr not in ('127.0.0.1', '::1'):
+        abort(404)
+    
+    lines = render_stats('auth', get_auth_stats()) + render_stats('response_cache', response_cache.stats())
+    return Response(metrics.render() + '\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+def init_metrics(app):
+    metrics.enabled = app.config.get('METRICS_ENABLED', False)
+    metrics.reset()
+    
+    if not metrics.enabled:
+        return
+    
+    with app.app_context():
+        for engine in app.extensions['sqlalchemy'].engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', _metrics_view)
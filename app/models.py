@@ -4,7 +4,8 @@ from app import db
 
 user_roles = db.Table('user_roles',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('role_id', db.Integer, db.ForeignKey('roles.id'), primary_key=True)
+    db.Column('role_id', db.Integer, db.ForeignKey('roles.id'), primary_key=True),
+    db.Index('ix_user_roles_role_id_user_id', 'role_id', 'user_id')
 )
 
 role_permissions = db.Table('role_permissions',
@@ -23,10 +24,12 @@ class User(db.Model):
     last_name = db.Column(db.String(100), nullable=False)
     middle_name = db.Column(db.String(100))
     is_active = db.Column(db.Boolean, default=True, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     deleted_at = db.Column(db.DateTime)
     
+    __table_args__ = (db.Index('ix_users_is_active_id', 'is_active', 'id'),)
+    
     roles = db.relationship('Role', secondary=user_roles, backref=db.backref('users', lazy='dynamic'))
     sessions = db.relationship('UserSession', backref='user', lazy=True, cascade='all, delete-orphan')
     
@@ -45,13 +48,16 @@ class User(db.Model):
         return data
     
     def has_permission(self, resource_type, action):
-        for role in self.roles:
-            if role.has_permission(resource_type, action):
-                return True
-        return False
+        from app.permissions import permission_index
+        return permission_index.user_has_permission(self.id, resource_type, action)
     
     def has_role(self, role_name):
-        return any(role.name == role_name for role in self.roles)
+        from app.permissions import permission_index
+        return permission_index.user_has_role(self.id, role_name)
+    
+    def effective_permissions(self):
+        from app.permissions import permission_index
+        return permission_index.permissions_for(self.id)
 
 
 class Role(db.Model):
@@ -62,6 +68,8 @@ class Role(db.Model):
     description = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = {'sqlite_autoincrement': True}
+    
     permissions = db.relationship('Permission', secondary=role_permissions, 
                                  backref=db.backref('roles', lazy='dynamic'))
     
@@ -111,9 +119,11 @@ class UserSession(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     session_token = db.Column(db.String(255), unique=True, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     is_active = db.Column(db.Boolean, default=True)
     
+    __table_args__ = (db.Index('ix_user_sessions_user_id_is_active', 'user_id', 'is_active'),)
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -122,3 +132,88 @@ class UserSession(db.Model):
             'expires_at': self.expires_at.isoformat() if self.expires_at else None,
             'is_active': self.is_active,
         }
+
+
+class SessionEpoch(db.Model):
+    __tablename__ = 'session_epochs'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    epoch = db.Column(db.Integer, default=0, nullable=False)
+
+
+class CollectionVersion(db.Model):
+    __tablename__ = 'collection_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+
+class Article(db.Model):
+    __tablename__ = 'articles'
+    __table_args__ = (
+        db.Index('ix_articles_title_id', 'title', 'id'),
+        db.Index('ix_articles_author_id', 'author', 'id'),
+        db.Index('ix_articles_created_at_id', 'created_at', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    content = db.Column(db.Text, nullable=False, default='')
+    author = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'content': self.content,
+            'author': self.author,
+        }
+
+
+class Document(db.Model):
+    __tablename__ = 'documents'
+    __table_args__ = (
+        db.Index('ix_documents_title_id', 'title', 'id'),
+        db.Index('ix_documents_type_id', 'type', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    type = db.Column(db.String(20), nullable=False, default='PDF')
+    size = db.Column(db.String(20), nullable=False, default='0 KB')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'type': self.type,
+            'size': self.size,
+        }
+
+
+class Report(db.Model):
+    __tablename__ = 'reports'
+    __table_args__ = (
+        db.Index('ix_reports_title_id', 'title', 'id'),
+        db.Index('ix_reports_date_id', 'date', 'id'),
+        db.Index('ix_reports_status_id', 'status', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='in_progress')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'date': self.date.isoformat() if self.date else None,
+            'status': self.status,
+        }
@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from threading import RLock
+import time
+
+from flask import current_app
+
+from app import db
+from app.caching import collection_versions
+from app.routing import replica_reads
+from app.models import Role, Permission, user_roles, role_permissions
+
+
+class PermissionIndex:
+    def __init__(self):
+        self._lock = RLock()
+        self._role_permissions = None
+        self._role_names = {}
+        self._user_roles = OrderedDict()
+        self._role_set_permissions = {}
+        self._built_at = 0.0
+        self._roles_version = None
+        self._user_roles_version = None
+    
+    def rebuild(self):
+        roles_version = collection_versions.get('roles')
+        role_permissions_map = {}
+        role_names = {}
+        
+        with replica_reads():
+            for role_id, name in db.session.execute(db.select(Role.id, Role.name)):
+                role_names[role_id] = name
+                role_permissions_map[role_id] = set()
+            
+            rows = db.session.execute(
+                db.select(role_permissions.c.role_id, Permission.resource_type, Permission.action)
+                .join(Permission, Permission.id == role_permissions.c.permission_id)
+            ).all()
+        
+        for role_id, resource_type, action in rows:
+            role_permissions_map.setdefault(role_id, set()).add((resource_type, action))
+        
+        with self._lock:
+            self._role_permissions = {
+                role_id: frozenset(perms) for role_id, perms in role_permissions_map.items()
+            }
+            self._role_names = role_names
+            self._user_roles.clear()
+            self._role_set_permissions.clear()
+            self._built_at = time.monotonic()
+            self._roles_version = roles_version
+    
+    def reset(self):
+        with self._lock:
+            self._role_permissions = None
+            self._role_names = {}
+            self._user_roles.clear()
+            self._role_set_permissions.clear()
+    
+    def _ensure_built(self):
+        # Версии в collection_versions общие для всех процессов: изменения ролей и назначений,
+        # сделанные другим worker-ом, видны здесь через COLLECTION_VERSION_TTL секунд
+        ttl = current_app.config.get('PERMISSION_INDEX_TTL', 60)
+        if (self._role_permissions is None or time.monotonic() - self._built_at > ttl
+                or collection_versions.get('roles') != self._roles_version):
+            self.rebuild()
+        
+        user_roles_version = collection_versions.get('user_roles')
+        if user_roles_version != self._user_roles_version:
+            with self._lock:
+                self._user_roles.clear()
+                self._user_roles_version = user_roles_version
+    
+    def role_ids_for(self, user_id):
+        self._ensure_built()
+        
+        with self._lock:
+            role_ids = self._user_roles.get(user_id)
+            if role_ids is not None:
+                self._user_roles.move_to_end(user_id)
+                return role_ids
+        
+        with replica_reads():
+            role_ids = frozenset(db.session.execute(
+                db.select(user_roles.c.role_id).where(user_roles.c.user_id == user_id)
+            ).scalars())
+        
+        max_users = current_app.config.get('PERMISSION_INDEX_MAX_USERS', 100000)
+        with self._lock:
+            self._user_roles[user_id] = role_ids
+            while len(self._user_roles) > max_users:
+                self._user_roles.popitem(last=False)
+        
+        return role_ids
+    
+    def permissions_for_roles(self, role_ids):
+        self._ensure_built()
+        
+        with self._lock:
+            permissions = self._role_set_permissions.get(role_ids)
+            if permissions is None:
+                permissions = frozenset().union(
+                    *(self._role_permissions.get(role_id, frozenset()) for role_id in role_ids)
+                )
+                if len(self._role_set_permissions) >= current_app.config.get('PERMISSION_INDEX_MAX_USERS', 100000):
+                    self._role_set_permissions.clear()
+                self._role_set_permissions[role_ids] = permissions
+        
+        return permissions
+    
+    def permissions_for(self, user_id):
+        return self.permissions_for_roles(self.role_ids_for(user_id))
+    
+    def roles_have_permission(self, role_ids, resource_type, action):
+        return (resource_type, action) in self.permissions_for_roles(role_ids)
+    
+    def roles_include(self, role_ids, role_name):
+        self._ensure_built()
+        return any(self._role_names.get(role_id) == role_name for role_id in role_ids)
+    
+    def user_has_permission(self, user_id, resource_type, action):
+        return self.roles_have_permission(self.role_ids_for(user_id), resource_type, action)
+    
+    def user_has_role(self, user_id, role_name):
+        return self.roles_include(self.role_ids_for(user_id), role_name)
+    
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._user_roles.pop(user_id, None)
+    
+    def refresh_role(self, role_id):
+        if self._role_permissions is None:
+            return
+        
+        role = db.session.get(Role, role_id)
+        
+        with self._lock:
+            if role is None:
+                self._role_permissions.pop(role_id, None)
+                self._role_names.pop(role_id, None)
+                self._user_roles.clear()
+            else:
+                self._role_permissions[role_id] = frozenset(
+                    (perm.resource_type, perm.action) for perm in role.permissions
+                )
+                self._role_names[role_id] = role.name
+            self._role_set_permissions.clear()
+
+
+permission_index = PermissionIndex()
@@ -0,0 +1,205 @@
+from collections import OrderedDict
+from threading import Lock, local
+import math
+import os
+import sqlite3
+import time
+
+from flask import jsonify, request
+
+
+def parse_rate(value):
+    limit, _, period = value.partition('/')
+    return int(limit), float(period or 60)
+
+
+def parse_rate_limits(value):
+    rules = {}
+    for item in value.split(','):
+        scope, _, rate = item.strip().partition('=')
+        if scope and rate:
+            rules[scope.strip()] = parse_rate(rate.strip())
+    return rules
+
+
+def _take(tokens, updated, now, limit, period):
+    tokens = min(limit, tokens + (now - updated) * limit / period)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) * period / limit
+
+
+class MemoryBuckets:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._lock = Lock()
+        self._buckets = OrderedDict()
+    
+    def take(self, key, limit, period):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit, now))
+            tokens, retry_after = _take(tokens, updated, now, limit, period)
+            self._buckets[key] = (tokens, now)
+            
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+    
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+    
+    def __len__(self):
+        return len(self._buckets)
+
+
+class FileBuckets:
+    purge_every = 1000
+    
+    def __init__(self, path):
+        self.path = path
+        self._local = local()
+        self._takes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS buckets ('
+            'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, '
+            'full_at REAL NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_buckets_full_at ON buckets (full_at)')
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def take(self, key, limit, period):
+        conn = self._connection()
+        now = time.time()
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (limit, now)
+            tokens, retry_after = _take(tokens, updated, now, limit, period)
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + (limit - tokens) * period / limit)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        self._takes += 1
+        if self._takes % self.purge_every == 0:
+            conn.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+        return retry_after
+    
+    def clear(self):
+        self._connection().execute('DELETE FROM buckets')
+    
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM buckets').fetchone()[0]
+
+
+class RateLimiter:
+    def __init__(self):
+        self.enabled = True
+        self.rules = {}
+        self._buckets = MemoryBuckets()
+        self._lock = Lock()
+        self._stats = {'allowed': 0, 'rejected': {}}
+    
+    def configure(self, config):
+        self.enabled = config.get('RATE_LIMIT_ENABLED', True)
+        rules = config.get('RATE_LIMITS', {})
+        self.rules = parse_rate_limits(rules) if isinstance(rules, str) else dict(rules)
+        
+        backend = config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'memory':
+            self._buckets = MemoryBuckets(config.get('RATE_LIMIT_MAX_KEYS', 100000))
+        elif backend == 'file':
+            self._buckets = FileBuckets(config['RATE_LIMIT_PATH'])
+        else:
+            raise ValueError(f'Unknown RATE_LIMIT_BACKEND: {backend}')
+        
+        with self._lock:
+            self._stats = {'allowed': 0, 'rejected': {}}
+    
+    def scope_for(self, endpoint, key):
+        blueprint = endpoint.rpartition('.')[0]
+        for scope in (f'{endpoint}.{key}', f'{blueprint}.{key}'):
+            if scope in self.rules:
+                return scope
+        return None
+    
+    def hit(self, scope, value):
+        limit, period = self.rules[scope]
+        retry_after = self._buckets.take(f'{scope}:{value}', limit, period)
+        
+        with self._lock:
+            if retry_after:
+                rejected = self._stats['rejected']
+                rejected[scope] = rejected.get(scope, 0) + 1
+            else:
+                self._stats['allowed'] += 1
+        return retry_after
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'allowed': self._stats['allowed'],
+                'rejected': dict(self._stats['rejected']),
+                'keys': len(self._buckets),
+            }
+
+
+rate_limiter = RateLimiter()
+
+
+def _client_ip():
+    return request.remote_addr or 'unknown'
+
+
+def _json_email():
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    if not isinstance(email, str) or not email.strip():
+        return None
+    return email.strip().lower()
+
+
+RATE_LIMIT_KEYS = {
+    'ip': _client_ip,
+    'email': _json_email,
+}
+
+
+def check_rate_limits():
+    if not rate_limiter.enabled or not rate_limiter.rules or request.endpoint is None:
+        return None
+    
+    for key, key_value in RATE_LIMIT_KEYS.items():
+        scope = rate_limiter.scope_for(request.endpoint, key)
+        if scope is None:
+            continue
+        
+        value = key_value()
+        if value is None:
+            continue
+        
+        retry_after = rate_limiter.hit(scope, value)
+        if retry_after:
+            response = jsonify({'error': 'Слишком много попыток, повторите позже'})
+            response.headers['Retry-After'] = str(math.ceil(retry_after))
+            return response, 429
+    
+    return None
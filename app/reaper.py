@@ -0,0 +1,62 @@
+from threading import Event, Thread
+import time
+
+from app import db
+from app.session_store import get_session_store
+
+
+def reap_sessions(batch_size=1000, max_batches=None):
+    store = get_session_store()
+    stats = {'deleted': 0, 'batches': 0}
+    started = time.perf_counter()
+    
+    while max_batches is None or stats['batches'] < max_batches:
+        deleted = store.purge_expired(batch_size)
+        if not deleted:
+            break
+        stats['deleted'] += deleted
+        stats['batches'] += 1
+    
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+class SessionReaper(Thread):
+    def __init__(self, app, interval, batch_size=1000, max_batches=100):
+        super().__init__(name='session-reaper', daemon=True)
+        self.app = app
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._stopped = Event()
+    
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    stats = reap_sessions(self.batch_size, self.max_batches)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Session reaper run failed')
+                    continue
+                finally:
+                    db.session.remove()
+            
+            if stats['deleted']:
+                self.app.logger.info(
+                    'Session reaper removed %d sessions in %.3fs', stats['deleted'], stats['seconds']
+                )
+    
+    def stop(self):
+        self._stopped.set()
+
+
+def start_session_reaper(app):
+    interval = app.config.get('SESSION_REAPER_INTERVAL', 0)
+    if not interval:
+        return None
+    
+    reaper = SessionReaper(app, interval, app.config.get('SESSION_REAPER_BATCH_SIZE', 1000))
+    reaper.start()
+    app.extensions['session_reaper'] = reaper
+    return reaper
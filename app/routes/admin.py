@@ -1,17 +1,28 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from datetime import datetime
 
 from app import db
-from app.models import User, Role, Permission
-from app.auth import login_required, role_required, get_current_user
+from app.models import User, Role, Permission, user_roles
+from app.auth import login_required, role_required, get_current_user, refresh_user_authorization
+from app.bulk_import import import_users, records_from_request
+from app.caching import cached_response, collection_versions, conditional_get
+from app.export import iter_export_lines, iter_gzip
+from app.permissions import permission_index
+from app.routing import replica_reads
 
 admin_bp = Blueprint('admin', __name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
 @admin_bp.route('/roles', methods=['GET'])
 @login_required
 @role_required('admin')
+@conditional_get('roles')
+@cached_response('roles')
 def get_roles():
-    roles = Role.query.all()
+    roles = Role.query.options(db.joinedload(Role.permissions)).all()
     return jsonify({
         'roles': [role.to_dict(include_permissions=True) for role in roles]
     }), 200
@@ -36,6 +47,8 @@ def create_role():
     
     db.session.add(role)
     db.session.commit()
+    permission_index.refresh_role(role.id)
+    collection_versions.bump('roles')
     
     return jsonify({
         'message': 'Роль успешно создана',
@@ -60,6 +73,8 @@ def update_role(role_id):
         role.description = data['description']
     
     db.session.commit()
+    permission_index.refresh_role(role_id)
+    collection_versions.bump('roles')
     
     return jsonify({
         'message': 'Роль успешно обновлена',
@@ -76,8 +91,15 @@ def delete_role(role_id):
     if role.name in ['admin', 'user']:
         return jsonify({'error': 'Нельзя удалить системную роль'}), 403
     
+    holder_ids = db.session.execute(
+        db.select(user_roles.c.user_id).where(user_roles.c.role_id == role_id)
+    ).scalars().all()
+    
     db.session.delete(role)
     db.session.commit()
+    permission_index.refresh_role(role_id)
+    refresh_user_authorization(*holder_ids)
+    collection_versions.bump('roles')
     
     return jsonify({'message': 'Роль успешно удалена'}), 200
 
@@ -85,6 +107,8 @@ def delete_role(role_id):
 @admin_bp.route('/permissions', methods=['GET'])
 @login_required
 @role_required('admin')
+@conditional_get('permissions')
+@cached_response('permissions')
 def get_permissions():
     permissions = Permission.query.all()
     return jsonify({
@@ -119,6 +143,7 @@ def create_permission():
     
     db.session.add(permission)
     db.session.commit()
+    collection_versions.bump('permissions')
     
     return jsonify({
         'message': 'Разрешение успешно создано',
@@ -134,6 +159,8 @@ def delete_permission(permission_id):
     
     db.session.delete(permission)
     db.session.commit()
+    permission_index.reset()
+    collection_versions.bump('roles', 'permissions')
     
     return jsonify({'message': 'Разрешение успешно удалено'}), 200
 
@@ -155,6 +182,8 @@ def add_permission_to_role(role_id):
     
     role.permissions.append(permission)
     db.session.commit()
+    permission_index.refresh_role(role_id)
+    collection_versions.bump('roles')
     
     return jsonify({
         'message': 'Разрешение успешно добавлено к роли',
@@ -174,6 +203,8 @@ def remove_permission_from_role(role_id, permission_id):
     
     role.permissions.remove(permission)
     db.session.commit()
+    permission_index.refresh_role(role_id)
+    collection_versions.bump('roles')
     
     return jsonify({'message': 'Разрешение успешно удалено из роли'}), 200
 
@@ -181,10 +212,78 @@ def remove_permission_from_role(role_id, permission_id):
 @admin_bp.route('/users', methods=['GET'])
 @login_required
 @role_required('admin')
+@replica_reads()
 def get_users():
-    users = User.query.all()
+    args = request.args
+    
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+        cursor = int(args['cursor']) if args.get('cursor') else None
+        created_from = datetime.fromisoformat(args['created_from']) if args.get('created_from') else None
+        created_to = datetime.fromisoformat(args['created_to']) if args.get('created_to') else None
+    except ValueError:
+        return jsonify({'error': 'Неверный формат параметров limit, cursor, created_from или created_to'}), 400
+    
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit должен быть от 1 до {MAX_PAGE_SIZE}'}), 400
+    
+    query = User.query.order_by(User.id)
+    
+    if cursor is not None:
+        query = query.filter(User.id > cursor)
+    
+    if args.get('is_active'):
+        query = query.filter(User.is_active == (args['is_active'].lower() in ('1', 'true', 'yes')))
+    
+    if args.get('role'):
+        query = query.filter(User.roles.any(Role.name == args['role']))
+    
+    if args.get('email_prefix'):
+        prefix = args['email_prefix']
+        query = query.filter(User.email >= prefix, User.email < prefix + '\uffff')
+    
+    if created_from:
+        query = query.filter(User.created_at >= created_from)
+    
+    if created_to:
+        query = query.filter(User.created_at < created_to)
+    
+    users = query.limit(limit + 1).all()
+    has_more = len(users) > limit
+    users = users[:limit]
+    
+    # Роли всей страницы одним запросом: selectinload грузит их пачками по 500 id,
+    # и число запросов росло бы с limit
+    roles_by_user = {user.id: [] for user in users}
+    for user_id, role in db.session.execute(
+        db.select(user_roles.c.user_id, Role)
+        .join(Role, Role.id == user_roles.c.role_id)
+        .where(user_roles.c.user_id.in_(roles_by_user))
+    ):
+        roles_by_user[user_id].append(role.to_dict())
+    
     return jsonify({
-        'users': [user.to_dict(include_roles=True) for user in users]
+        'users': [dict(user.to_dict(), roles=roles_by_user[user.id]) for user in users],
+        'next_cursor': str(users[-1].id) if has_more else None
+    }), 200
+
+
+@admin_bp.route('/users/import', methods=['POST'])
+@login_required
+@role_required('admin')
+def bulk_import_users():
+    try:
+        stats = import_users(
+            records_from_request(request),
+            cost=current_app.config['BCRYPT_LOG_ROUNDS'],
+            workers=current_app.config.get('IMPORT_HASH_WORKERS')
+        )
+    except ValueError:
+        return jsonify({'error': 'Неверный формат данных для импорта'}), 400
+    
+    return jsonify({
+        'message': 'Импорт завершен',
+        'stats': stats
     }), 200
 
 
@@ -205,6 +304,7 @@ def add_role_to_user(user_id):
     
     user.roles.append(role)
     db.session.commit()
+    refresh_user_authorization(user_id)
     
     return jsonify({
         'message': 'Роль успешно назначена пользователю',
@@ -230,5 +330,22 @@ def remove_role_from_user(user_id, role_id):
     
     user.roles.remove(role)
     db.session.commit()
+    refresh_user_authorization(user_id)
     
     return jsonify({'message': 'Роль успешно удалена у пользователя'}), 200
+
+
+@admin_bp.route('/export', methods=['GET'])
+@login_required
+@role_required('admin')
+def export_data():
+    lines = iter_export_lines()
+    
+    if request.args.get('gzip', '').lower() in ('1', 'true', 'yes'):
+        return Response(
+            stream_with_context(iter_gzip(lines)),
+            mimetype='application/gzip',
+            headers={'Content-Disposition': 'attachment; filename=export.ndjson.gz'}
+        )
+    
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
@@ -1,15 +1,21 @@
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, Response, request, jsonify, session
 from datetime import datetime
+import hashlib
 
 from app import db
 from app.models import User, Role
 from app.auth import (
     hash_password, verify_password, create_user_session, 
-    get_current_user, invalidate_user_sessions
+    get_current_user, invalidate_session, needs_rehash, schedule_rehash,
+    get_current_principal, login_required, verify_dummy_password
 )
+from app.caching import collection_versions
+from app.login_cache import negative_login_cache, UNKNOWN, INACTIVE
 
 auth_bp = Blueprint('auth', __name__)
 
+MAX_BATCH_CHECKS = 1000
+
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
@@ -43,6 +49,7 @@ def register():
     
     db.session.add(user)
     db.session.commit()
+    collection_versions.bump('users')
     
     return jsonify({
         'message': 'Пользователь успешно зарегистрирован',
@@ -57,17 +64,35 @@ def login():
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Email и пароль обязательны'}), 400
     
-    user = User.query.filter_by(email=data['email']).first()
-    
-    if not user:
+    # Версия 'users' общая для всех процессов: регистрация или смена email в другом worker-е
+    # делает закешированные здесь отказы недействительными
+    users_version = collection_versions.get('users')
+    rejected = negative_login_cache.get(data['email'], users_version)
+    
+    if rejected is None:
+        user = User.query.filter_by(email=data['email']).first()
+        
+        if not user:
+            rejected = UNKNOWN
+        elif not user.is_active:
+            rejected = INACTIVE
+        
+        if rejected:
+            negative_login_cache.put(data['email'], rejected, users_version)
+    
+    if rejected:
+        verify_dummy_password(data['password'])
+        
+        if rejected == INACTIVE:
+            return jsonify({'error': 'Аккаунт деактивирован'}), 403
         return jsonify({'error': 'Неверный email или пароль'}), 401
     
-    if not user.is_active:
-        return jsonify({'error': 'Аккаунт деактивирован'}), 403
-    
     if not verify_password(user.password_hash, data['password']):
         return jsonify({'error': 'Неверный email или пароль'}), 401
     
+    if needs_rehash(user.password_hash):
+        schedule_rehash(user.id, user.password_hash, data['password'])
+    
     session_token = create_user_session(user.id)
     session['session_token'] = session_token
     session.permanent = True
@@ -84,11 +109,7 @@ def logout():
     session_token = session.get('session_token')
     
     if session_token:
-        from app.models import UserSession
-        user_session = UserSession.query.filter_by(session_token=session_token).first()
-        if user_session:
-            user_session.is_active = False
-            db.session.commit()
+        invalidate_session(session_token)
     
     session.clear()
     
@@ -103,3 +124,52 @@ def get_me():
         return jsonify({'error': 'Unauthorized'}), 401
     
     return jsonify({'user': user.to_dict(include_roles=True)}), 200
+
+
+@auth_bp.route('/check', methods=['POST'])
+@login_required
+def check_permissions():
+    data = request.get_json(silent=True) or {}
+    checks = data.get('checks')
+    
+    if not isinstance(checks, list):
+        return jsonify({'error': 'Поле checks должно быть списком пар (resource_type, action)'}), 400
+    
+    if len(checks) > MAX_BATCH_CHECKS:
+        return jsonify({'error': f'Не больше {MAX_BATCH_CHECKS} проверок за запрос'}), 400
+    
+    pairs = []
+    for check in checks:
+        if isinstance(check, dict):
+            check = (check.get('resource_type'), check.get('action'))
+        if not isinstance(check, (list, tuple)) or len(check) != 2 or not all(isinstance(v, str) for v in check):
+            return jsonify({'error': 'Каждая проверка - пара (resource_type, action)'}), 400
+        pairs.append(tuple(check))
+    
+    permissions = get_current_principal().permissions()
+    
+    return jsonify({
+        'decisions': [pair in permissions for pair in pairs]
+    }), 200
+
+
+@auth_bp.route('/me/permissions', methods=['GET'])
+@login_required
+def get_my_permissions():
+    permissions = sorted(get_current_principal().permissions())
+    etag = hashlib.blake2b(repr(permissions).encode('utf-8'), digest_size=8).hexdigest()
+    
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({
+            'permissions': [
+                {'resource_type': resource_type, 'action': action}
+                for resource_type, action in permissions
+            ]
+        })
+    
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Cookie')
+    return response
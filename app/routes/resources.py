@@ -1,51 +1,168 @@
 from flask import Blueprint, request, jsonify
+from datetime import date, datetime
+import base64
+import json
 
+from app import db
+from app.models import Article, Document, Report
 from app.auth import login_required, permission_required, get_current_user
+from app.caching import cached_response, collection_versions, conditional_get
 
 resources_bp = Blueprint('resources', __name__)
 
-MOCK_ARTICLES = [
-    {'id': 1, 'title': 'Введение в Python', 'content': 'Python - это высокоуровневый язык программирования...', 'author': 'Иван Иванов'},
-    {'id': 2, 'title': 'Основы Flask', 'content': 'Flask - микрофреймворк для веб-разработки...', 'author': 'Петр Петров'},
-    {'id': 3, 'title': 'SQLAlchemy ORM', 'content': 'SQLAlchemy - это SQL toolkit и ORM для Python...', 'author': 'Сидор Сидоров'},
-]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
-MOCK_DOCUMENTS = [
-    {'id': 1, 'title': 'Спецификация проекта', 'type': 'PDF', 'size': '2.4 MB'},
-    {'id': 2, 'title': 'Техническое задание', 'type': 'DOCX', 'size': '1.8 MB'},
-    {'id': 3, 'title': 'Договор поставки', 'type': 'PDF', 'size': '0.5 MB'},
-]
+LISTING_PARAMS = ('limit', 'cursor', 'fields', 'sort')
 
-MOCK_REPORTS = [
-    {'id': 1, 'title': 'Финансовый отчет Q1 2026', 'date': '2026-03-31', 'status': 'completed'},
-    {'id': 2, 'title': 'Отчет по продажам', 'date': '2026-02-01', 'status': 'in_progress'},
-    {'id': 3, 'title': 'Аналитический отчет', 'date': '2026-01-15', 'status': 'completed'},
-]
+LISTING_FIELDS = {
+    'articles': ('id', 'title', 'content', 'author'),
+    'documents': ('id', 'title', 'type', 'size'),
+    'reports': ('id', 'title', 'date', 'status'),
+}
+
+SORT_KEYS = {
+    'articles': ('id', 'title', 'author', 'created_at'),
+    'documents': ('id', 'title', 'type'),
+    'reports': ('id', 'title', 'date', 'status'),
+}
+
+
+class ListingError(ValueError):
+    pass
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_cursor(sort_value, item_id):
+    payload = json.dumps([_json_value(sort_value), item_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor, column):
+    try:
+        sort_value, item_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if sort_value is not None and isinstance(column.type, db.DateTime):
+            sort_value = datetime.fromisoformat(sort_value)
+        elif sort_value is not None and isinstance(column.type, db.Date):
+            sort_value = date.fromisoformat(sort_value)
+        return sort_value, int(item_id)
+    except (ValueError, TypeError):
+        raise ListingError('Неверный cursor')
+
+
+def _list_collection(model, resource_type):
+    args = request.args
+    
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ListingError('limit должен быть числом')
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ListingError(f'limit должен быть от 1 до {MAX_PAGE_SIZE}')
+    
+    fields = LISTING_FIELDS[resource_type]
+    if args.get('fields'):
+        fields = tuple(dict.fromkeys(field.strip() for field in args['fields'].split(',') if field.strip()))
+        unknown = [field for field in fields if field not in LISTING_FIELDS[resource_type]]
+        if unknown or not fields:
+            raise ListingError(f'Недопустимые поля: {", ".join(unknown)}. '
+                               f'Доступны: {", ".join(LISTING_FIELDS[resource_type])}')
+    
+    sort = args.get('sort', 'id')
+    descending = sort.startswith('-')
+    sort_key = sort.lstrip('-')
+    if sort_key not in SORT_KEYS[resource_type]:
+        raise ListingError(f'Сортировка возможна по полям: {", ".join(SORT_KEYS[resource_type])}')
+    
+    sort_column = getattr(model, sort_key)
+    columns = [getattr(model, field) for field in fields]
+    query = db.select(*columns, sort_column.label('_sort'), model.id.label('_id'))
+    
+    # NULL считается меньше любого значения: в начале при сортировке по возрастанию, в конце - по убыванию
+    nullable = model.__table__.c[sort_key].nullable
+    
+    # Страница собирается из отрезков, каждый из которых SQLite находит поиском по индексу:
+    # сравнение пар (sort, id) и IS NULL в одном OR превращают поиск в сканирование индекса
+    segments = [query]
+    if args.get('cursor'):
+        sort_value, last_id = _decode_cursor(args['cursor'], sort_column)
+        if sort_key == 'id':
+            segments = [query.where(model.id < last_id if descending else model.id > last_id)]
+        elif sort_value is None:
+            segments = [query.where(sort_column.is_(None), model.id < last_id if descending else model.id > last_id)]
+            if not descending:
+                segments.append(query.where(sort_column.is_not(None)))
+        else:
+            position = db.tuple_(sort_column, model.id)
+            after = position < (sort_value, last_id) if descending else position > (sort_value, last_id)
+            segments = [query.where(after)]
+            if descending and nullable:
+                segments.append(query.where(sort_column.is_(None)))
+    
+    if sort_key == 'id':
+        order = [model.id.desc() if descending else model.id]
+    elif descending:
+        order = [sort_column.desc().nulls_last() if nullable else sort_column.desc(), model.id.desc()]
+    else:
+        order = [sort_column.nulls_first() if nullable else sort_column, model.id]
+    
+    rows = []
+    for segment in segments:
+        rows += db.session.execute(segment.order_by(*order).limit(limit + 1 - len(rows))).all()
+        if len(rows) > limit:
+            break
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        'resource_type': resource_type,
+        'action': 'read',
+        'data': [
+            {field: _json_value(value) for field, value in zip(fields, row)}
+            for row in rows
+        ],
+        'next_cursor': _encode_cursor(rows[-1]._sort, rows[-1]._id) if has_more else None,
+    }
+
+
+@resources_bp.errorhandler(ListingError)
+def listing_error(error):
+    return jsonify({'error': str(error)}), 400
 
 
 @resources_bp.route('/articles', methods=['GET'])
 @login_required
 @permission_required('articles', 'read')
+@conditional_get('articles', LISTING_PARAMS)
+@cached_response('articles', LISTING_PARAMS)
 def get_articles():
-    return jsonify({
-        'resource_type': 'articles',
-        'action': 'read',
-        'data': MOCK_ARTICLES
-    }), 200
+    return jsonify(_list_collection(Article, 'articles')), 200
 
 
 @resources_bp.route('/articles/<int:article_id>', methods=['GET'])
 @login_required
 @permission_required('articles', 'read')
 def get_article(article_id):
-    article = next((a for a in MOCK_ARTICLES if a['id'] == article_id), None)
+    article = db.session.get(Article, article_id)
     if not article:
         return jsonify({'error': 'Статья не найдена'}), 404
     
     return jsonify({
         'resource_type': 'articles',
         'action': 'read',
-        'data': article
+        'data': article.to_dict()
     }), 200
 
 
@@ -55,18 +172,21 @@ def get_article(article_id):
 def create_article():
     data = request.get_json()
     
-    new_article = {
-        'id': len(MOCK_ARTICLES) + 1,
-        'title': data.get('title', 'Новая статья'),
-        'content': data.get('content', ''),
-        'author': get_current_user().email
-    }
+    article = Article(
+        title=data.get('title', 'Новая статья'),
+        content=data.get('content', ''),
+        author=get_current_user().email
+    )
+    
+    db.session.add(article)
+    db.session.commit()
+    collection_versions.bump('articles')
     
     return jsonify({
         'message': 'Статья успешно создана',
         'resource_type': 'articles',
         'action': 'create',
-        'data': new_article
+        'data': article.to_dict()
     }), 201
 
 
@@ -76,21 +196,20 @@ def create_article():
 def update_article(article_id):
     data = request.get_json()
     
-    article = next((a for a in MOCK_ARTICLES if a['id'] == article_id), None)
+    article = db.session.get(Article, article_id)
     if not article:
         return jsonify({'error': 'Статья не найдена'}), 404
     
-    updated_article = article.copy()
-    updated_article.update({
-        'title': data.get('title', article['title']),
-        'content': data.get('content', article['content'])
-    })
+    article.title = data.get('title', article.title)
+    article.content = data.get('content', article.content)
+    db.session.commit()
+    collection_versions.bump('articles')
     
     return jsonify({
         'message': 'Статья успешно обновлена',
         'resource_type': 'articles',
         'action': 'update',
-        'data': updated_article
+        'data': article.to_dict()
     }), 200
 
 
@@ -98,12 +217,17 @@ def update_article(article_id):
 @login_required
 @permission_required('articles', 'delete')
 def delete_article(article_id):
-    article = next((a for a in MOCK_ARTICLES if a['id'] == article_id), None)
+    article = db.session.get(Article, article_id)
     if not article:
         return jsonify({'error': 'Статья не найдена'}), 404
     
+    title = article.title
+    db.session.delete(article)
+    db.session.commit()
+    collection_versions.bump('articles')
+    
     return jsonify({
-        'message': f'Статья "{article["title"]}" успешно удалена',
+        'message': f'Статья "{title}" успешно удалена',
         'resource_type': 'articles',
         'action': 'delete'
     }), 200
@@ -112,12 +236,10 @@ def delete_article(article_id):
 @resources_bp.route('/documents', methods=['GET'])
 @login_required
 @permission_required('documents', 'read')
+@conditional_get('documents', LISTING_PARAMS)
+@cached_response('documents', LISTING_PARAMS)
 def get_documents():
-    return jsonify({
-        'resource_type': 'documents',
-        'action': 'read',
-        'data': MOCK_DOCUMENTS
-    }), 200
+    return jsonify(_list_collection(Document, 'documents')), 200
 
 
 @resources_bp.route('/documents', methods=['POST'])
@@ -126,18 +248,21 @@ def get_documents():
 def create_document():
     data = request.get_json()
     
-    new_document = {
-        'id': len(MOCK_DOCUMENTS) + 1,
-        'title': data.get('title', 'Новый документ'),
-        'type': data.get('type', 'PDF'),
-        'size': '0 KB'
-    }
+    document = Document(
+        title=data.get('title', 'Новый документ'),
+        type=data.get('type', 'PDF'),
+        size='0 KB'
+    )
+    
+    db.session.add(document)
+    db.session.commit()
+    collection_versions.bump('documents')
     
     return jsonify({
         'message': 'Документ успешно создан',
         'resource_type': 'documents',
         'action': 'create',
-        'data': new_document
+        'data': document.to_dict()
     }), 201
 
 
@@ -145,12 +270,17 @@ def create_document():
 @login_required
 @permission_required('documents', 'delete')
 def delete_document(document_id):
-    document = next((d for d in MOCK_DOCUMENTS if d['id'] == document_id), None)
+    document = db.session.get(Document, document_id)
     if not document:
         return jsonify({'error': 'Документ не найден'}), 404
     
+    title = document.title
+    db.session.delete(document)
+    db.session.commit()
+    collection_versions.bump('documents')
+    
     return jsonify({
-        'message': f'Документ "{document["title"]}" успешно удален',
+        'message': f'Документ "{title}" успешно удален',
         'resource_type': 'documents',
         'action': 'delete'
     }), 200
@@ -159,12 +289,10 @@ def delete_document(document_id):
 @resources_bp.route('/reports', methods=['GET'])
 @login_required
 @permission_required('reports', 'read')
+@conditional_get('reports', LISTING_PARAMS)
+@cached_response('reports', LISTING_PARAMS)
 def get_reports():
-    return jsonify({
-        'resource_type': 'reports',
-        'action': 'read',
-        'data': MOCK_REPORTS
-    }), 200
+    return jsonify(_list_collection(Report, 'reports')), 200
 
 
 @resources_bp.route('/reports', methods=['POST'])
@@ -173,18 +301,25 @@ def get_reports():
 def create_report():
     data = request.get_json()
     
-    new_report = {
-        'id': len(MOCK_REPORTS) + 1,
-        'title': data.get('title', 'Новый отчет'),
-        'date': data.get('date', '2026-02-13'),
-        'status': 'in_progress'
-    }
+    report_date = _parse_date(data['date']) if data.get('date') else date.today()
+    if report_date is None:
+        return jsonify({'error': 'Дата должна быть в формате YYYY-MM-DD'}), 400
+    
+    report = Report(
+        title=data.get('title', 'Новый отчет'),
+        date=report_date,
+        status='in_progress'
+    )
+    
+    db.session.add(report)
+    db.session.commit()
+    collection_versions.bump('reports')
     
     return jsonify({
         'message': 'Отчет успешно создан',
         'resource_type': 'reports',
         'action': 'create',
-        'data': new_report
+        'data': report.to_dict()
     }), 201
 
 
@@ -194,19 +329,18 @@ def create_report():
 def update_report(report_id):
     data = request.get_json()
     
-    report = next((r for r in MOCK_REPORTS if r['id'] == report_id), None)
+    report = db.session.get(Report, report_id)
     if not report:
         return jsonify({'error': 'Отчет не найден'}), 404
     
-    updated_report = report.copy()
-    updated_report.update({
-        'title': data.get('title', report['title']),
-        'status': data.get('status', report['status'])
-    })
+    report.title = data.get('title', report.title)
+    report.status = data.get('status', report.status)
+    db.session.commit()
+    collection_versions.bump('reports')
     
     return jsonify({
         'message': 'Отчет успешно обновлен',
         'resource_type': 'reports',
         'action': 'update',
-        'data': updated_report
+        'data': report.to_dict()
     }), 200
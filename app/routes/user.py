@@ -4,6 +4,8 @@ from datetime import datetime
 from app import db
 from app.models import User
 from app.auth import login_required, get_current_user, invalidate_user_sessions, hash_password
+from app.caching import collection_versions
+from app.login_cache import negative_login_cache
 
 user_bp = Blueprint('user', __name__)
 
@@ -30,14 +32,18 @@ def update_profile():
     if 'middle_name' in data:
         user.middle_name = data['middle_name']
     
+    email_changed = False
     if 'email' in data and data['email']:
         existing_user = User.query.filter_by(email=data['email']).first()
         if existing_user and existing_user.id != user.id:
             return jsonify({'error': 'Email уже используется другим пользователем'}), 409
+        email_changed = user.email != data['email']
         user.email = data['email']
     
     user.updated_at = datetime.utcnow()
     db.session.commit()
+    if email_changed:
+        collection_versions.bump('users')
     
     return jsonify({
         'message': 'Профиль успешно обновлен',
@@ -73,13 +79,7 @@ def change_password():
     
     from flask import session
     current_token = session.get('session_token')
-    from app.models import UserSession
-    UserSession.query.filter(
-        UserSession.user_id == user.id,
-        UserSession.session_token != current_token,
-        UserSession.is_active == True
-    ).update({'is_active': False})
-    db.session.commit()
+    invalidate_user_sessions(user.id, except_token=current_token)
     
     return jsonify({'message': 'Пароль успешно изменен'}), 200
 
@@ -95,6 +95,7 @@ def delete_account():
     invalidate_user_sessions(user.id)
     
     db.session.commit()
+    negative_login_cache.evict(user.email)
     
     from flask import session
     session.clear()
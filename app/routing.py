@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+
+@contextmanager
+def replica_reads():
+    if not has_app_context():
+        yield
+        return
+    
+    g._replica_depth = g.get('_replica_depth', 0) + 1
+    try:
+        yield
+    finally:
+        g._replica_depth -= 1
+
+
+def replica_enabled():
+    return REPLICA_BIND in current_app.extensions['sqlalchemy'].engines
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            g._read_from_replica = True
+            return self._db.engines[REPLICA_BIND]
+        
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    
+    def _reads_from_replica(self, clause):
+        if not isinstance(clause, sa.Select) or self._flushing:
+            return False
+        
+        if not has_app_context() or not g.get('_replica_depth'):
+            return False
+        
+        engines = self._db.engines
+        if REPLICA_BIND not in engines:
+            return False
+        
+        if self.new or self.dirty or self.deleted:
+            return False
+        
+        window = current_app.config.get('REPLICA_READ_YOUR_WRITES_WINDOW', 5)
+        last_write = self.info.get('last_write_at')
+        if has_request_context():
+            last_write = max(last_write or 0, flask_session.get('_last_write_at', 0))
+        
+        return not last_write or time.time() - last_write > window
+
+
+@sa.event.listens_for(RoutingSession, 'after_flush')
+def _mark_pending_write(session, flush_context):
+    session.info['wrote'] = True
+
+
+@sa.event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _record_write(session):
+    # Без реплики метка не нужна, а запись в cookie сессии меняла бы ответ после каждого коммита
+    if not session.info.pop('wrote', False) or not has_app_context() or not replica_enabled():
+        return
+    
+    session.info['last_write_at'] = time.time()
+    if has_request_context():
+        flask_session['_last_write_at'] = session.info['last_write_at']
+
+
+@sa.event.listens_for(RoutingSession, 'after_rollback')
+def _forget_write(session):
+    session.info.pop('wrote', None)
+
+
+def configure_replica(app):
+    replica_uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if replica_uri:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[REPLICA_BIND] = replica_uri
+        app.config['SQLALCHEMY_BINDS'] = binds
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+import time
+
+
+class SessionCache:
+    def __init__(self, maxsize=10000, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+    
+    def configure(self, config):
+        self.maxsize = config.get('SESSION_CACHE_SIZE', self.maxsize)
+        self.ttl = config.get('SESSION_CACHE_TTL', self.ttl)
+        self.clear()
+    
+    def get(self, session_token):
+        with self._lock:
+            entry = self._entries.get(session_token)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            
+            user_id, expires_at, epoch, cached_at = entry
+            if time.monotonic() - cached_at > self.ttl or expires_at < datetime.utcnow():
+                self._remove(session_token)
+                self._stats['evictions'] += 1
+                self._stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(session_token)
+            self._stats['hits'] += 1
+            return user_id, epoch
+    
+    def put(self, session_token, user_id, expires_at, epoch):
+        if self.maxsize <= 0:
+            return
+        
+        with self._lock:
+            self._remove(session_token)
+            self._entries[session_token] = (user_id, expires_at, epoch, time.monotonic())
+            self._tokens_by_user.setdefault(user_id, set()).add(session_token)
+            
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats['evictions'] += 1
+    
+    def evict(self, session_token):
+        with self._lock:
+            if self._remove(session_token):
+                self._stats['invalidations'] += 1
+    
+    def evict_user(self, user_id, except_token=None):
+        with self._lock:
+            for session_token in list(self._tokens_by_user.get(user_id, ())):
+                if session_token != except_token and self._remove(session_token):
+                    self._stats['invalidations'] += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+    
+    def _remove(self, session_token):
+        entry = self._entries.pop(session_token, None)
+        if entry is None:
+            return False
+        
+        tokens = self._tokens_by_user.get(entry[0])
+        if tokens is not None:
+            tokens.discard(session_token)
+            if not tokens:
+                del self._tokens_by_user[entry[0]]
+        return True
+
+
+session_cache = SessionCache()
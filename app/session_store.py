@@ -0,0 +1,289 @@
+from datetime import datetime, timezone
+from threading import Lock, local
+import os
+import secrets
+import sqlite3
+import time
+
+from flask import current_app
+from itsdangerous import URLSafeSerializer, BadSignature
+
+from app import db
+from app.models import UserSession, SessionEpoch
+
+
+def create_session_token():
+    return secrets.token_urlsafe(32)
+
+
+def bump_session_epoch(user_id):
+    updated = SessionEpoch.query.filter_by(user_id=user_id).update(
+        {'epoch': SessionEpoch.epoch + 1}
+    )
+    if not updated:
+        db.session.add(SessionEpoch(user_id=user_id, epoch=1))
+    db.session.commit()
+
+
+class SessionStore:
+    stateless = False
+    
+    def create(self, user_id, expires_at):
+        raise NotImplementedError
+    
+    def get(self, session_token):
+        raise NotImplementedError
+    
+    def invalidate(self, session_token):
+        raise NotImplementedError
+    
+    def invalidate_user(self, user_id, except_token=None):
+        raise NotImplementedError
+    
+    def purge_expired(self, batch_size=1000):
+        return 0
+
+
+class SQLAlchemySessionStore(SessionStore):
+    def create(self, user_id, expires_at):
+        session_token = create_session_token()
+        
+        user_session = UserSession(
+            user_id=user_id,
+            session_token=session_token,
+            expires_at=expires_at
+        )
+        
+        db.session.add(user_session)
+        db.session.commit()
+        
+        return session_token
+    
+    def get(self, session_token):
+        user_session = UserSession.query.filter(
+            UserSession.session_token == session_token,
+            UserSession.is_active == True,
+            UserSession.expires_at > datetime.utcnow()
+        ).first()
+        
+        if not user_session:
+            return None
+        
+        return user_session.user_id, user_session.expires_at
+    
+    def invalidate(self, session_token):
+        UserSession.query.filter_by(session_token=session_token).update({'is_active': False})
+        db.session.commit()
+    
+    def invalidate_user(self, user_id, except_token=None):
+        query = UserSession.query.filter(
+            UserSession.user_id == user_id,
+            UserSession.is_active == True
+        )
+        if except_token:
+            query = query.filter(UserSession.session_token != except_token)
+        query.update({'is_active': False})
+        db.session.commit()
+    
+    def purge_expired(self, batch_size=1000):
+        batch = db.select(UserSession.id).where(
+            db.or_(UserSession.expires_at < datetime.utcnow(), UserSession.is_active == False)
+        ).limit(batch_size)
+        
+        deleted = db.session.execute(
+            db.delete(UserSession).where(UserSession.id.in_(batch.scalar_subquery())),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        return deleted
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self):
+        self._lock = Lock()
+        self._sessions = {}
+    
+    def create(self, user_id, expires_at):
+        session_token = create_session_token()
+        with self._lock:
+            self._sessions[session_token] = (user_id, expires_at)
+        return session_token
+    
+    def get(self, session_token):
+        stored = self._sessions.get(session_token)
+        
+        if not stored or stored[1] < datetime.utcnow():
+            return None
+        
+        return stored
+    
+    def invalidate(self, session_token):
+        with self._lock:
+            self._sessions.pop(session_token, None)
+    
+    def invalidate_user(self, user_id, except_token=None):
+        with self._lock:
+            for session_token, (owner_id, _) in list(self._sessions.items()):
+                if owner_id == user_id and session_token != except_token:
+                    del self._sessions[session_token]
+    
+    def purge_expired(self, batch_size=1000):
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [
+                session_token for session_token, (_, expires_at) in self._sessions.items()
+                if expires_at < now
+            ][:batch_size]
+            for session_token in expired:
+                del self._sessions[session_token]
+        return len(expired)
+
+
+class FileSessionStore(SessionStore):
+    def __init__(self, path):
+        self.path = path
+        self._local = local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        conn = self._connection()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'session_token TEXT PRIMARY KEY, user_id INTEGER NOT NULL, expires_at TEXT NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)')
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+    
+    def create(self, user_id, expires_at):
+        session_token = create_session_token()
+        self._connection().execute(
+            'INSERT INTO sessions (session_token, user_id, expires_at) VALUES (?, ?, ?)',
+            (session_token, user_id, expires_at.isoformat())
+        )
+        return session_token
+    
+    def get(self, session_token):
+        row = self._connection().execute(
+            'SELECT user_id, expires_at FROM sessions WHERE session_token = ? AND expires_at > ?',
+            (session_token, datetime.utcnow().isoformat())
+        ).fetchone()
+        
+        if not row:
+            return None
+        
+        return row[0], datetime.fromisoformat(row[1])
+    
+    def invalidate(self, session_token):
+        self._connection().execute('DELETE FROM sessions WHERE session_token = ?', (session_token,))
+    
+    def invalidate_user(self, user_id, except_token=None):
+        self._connection().execute(
+            'DELETE FROM sessions WHERE user_id = ? AND session_token != ?',
+            (user_id, except_token or '')
+        )
+    
+    def purge_expired(self, batch_size=1000):
+        return self._connection().execute(
+            'DELETE FROM sessions WHERE rowid IN '
+            '(SELECT rowid FROM sessions WHERE expires_at < ? LIMIT ?)',
+            (datetime.utcnow().isoformat(), batch_size)
+        ).rowcount
+
+
+class SignedTokenStore(SessionStore):
+    stateless = True
+    
+    def __init__(self, secret_key, epoch_ttl=5):
+        self.epoch_ttl = epoch_ttl
+        self._serializer = URLSafeSerializer(secret_key, salt='session-token')
+        self._lock = Lock()
+        self._epochs = {}
+    
+    def _epoch(self, user_id, fresh=False):
+        cached = self._epochs.get(user_id)
+        if not fresh and cached is not None and time.monotonic() - cached[1] < self.epoch_ttl:
+            return cached[0]
+        
+        row = db.session.get(SessionEpoch, user_id)
+        epoch = row.epoch if row else 0
+        with self._lock:
+            self._epochs[user_id] = (epoch, time.monotonic())
+        return epoch
+    
+    def _bump_epoch(self, user_id):
+        bump_session_epoch(user_id)
+        
+        with self._lock:
+            self._epochs.pop(user_id, None)
+    
+    def create(self, user_id, expires_at):
+        from app.permissions import permission_index
+        
+        return self._serializer.dumps({
+            'u': user_id,
+            'e': int(expires_at.replace(tzinfo=timezone.utc).timestamp()),
+            'r': sorted(permission_index.role_ids_for(user_id)),
+            'v': self._epoch(user_id, fresh=True),
+        })
+    
+    def claims(self, session_token):
+        try:
+            payload = self._serializer.loads(session_token)
+        except BadSignature:
+            return None
+        
+        if payload['e'] < time.time():
+            return None
+        
+        if payload['v'] != self._epoch(payload['u']):
+            return None
+        
+        return payload
+    
+    def get(self, session_token):
+        payload = self.claims(session_token)
+        
+        if payload is None:
+            return None
+        
+        return payload['u'], datetime.utcfromtimestamp(payload['e'])
+    
+    def invalidate(self, session_token):
+        try:
+            payload = self._serializer.loads(session_token)
+        except BadSignature:
+            return
+        self._bump_epoch(payload['u'])
+    
+    def invalidate_user(self, user_id, except_token=None):
+        self._bump_epoch(user_id)
+
+
+def init_session_store(app):
+    backend = app.config.get('SESSION_STORE', 'sqlalchemy')
+    
+    if backend == 'sqlalchemy':
+        store = SQLAlchemySessionStore()
+    elif backend == 'memory':
+        store = MemorySessionStore()
+    elif backend == 'file':
+        store = FileSessionStore(app.config['SESSION_STORE_PATH'])
+    elif backend == 'signed':
+        store = SignedTokenStore(app.config['SECRET_KEY'], app.config.get('SESSION_EPOCH_TTL', 5))
+    else:
+        raise ValueError(f'Unknown SESSION_STORE backend: {backend}')
+    
+    app.extensions['session_store'] = store
+    return store
+
+
+def get_session_store():
+    return current_app.extensions['session_store']
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+import math
+import random
+import time
+
+import bcrypt as _bcrypt
+from flask import current_app
+
+from app import db
+from app.caching import collection_versions
+from app.models import User, Role, Permission, UserSession, user_roles, role_permissions
+from app.session_store import create_session_token
+
+ACTIONS = ('create', 'read', 'update', 'delete', 'list', 'export', 'approve', 'share')
+FIRST_NAMES = ('Алексей', 'Мария', 'Иван', 'Ольга', 'Петр', 'Анна', 'Дмитрий', 'Елена', 'Сергей', 'Наталья')
+LAST_NAMES = ('Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев')
+
+# Сколько ролей у пользователя: большинству хватает одной-двух, у небольшой доли их много
+ROLE_FANOUT = ((1, 0.55), (2, 0.25), (3, 0.12), (5, 0.06), (10, 0.02))
+
+
+def _skewed(rng, n, skew):
+    # Индекс 0..n-1 со степенным перекосом к началу: небольшая часть ролей/пользователей
+    # получает основную долю связей, как в реальных данных
+    return min(n - 1, int(n * rng.random() ** skew))
+
+
+def _next_id(model):
+    return (db.session.execute(db.select(db.func.max(model.id))).scalar() or 0) + 1
+
+
+def _insert(table, rows):
+    if rows:
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+
+def generate(users=1000000, roles=2000, permissions=20000, sessions=2000000, perms_per_role=30,
+             password='password123', cost=None, seed=42, batch_size=10000, progress=None):
+    rng = random.Random(seed)
+    stats = {'users': 0, 'roles': 0, 'permissions': 0, 'user_roles': 0, 'role_permissions': 0, 'sessions': 0}
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    
+    def report(stage):
+        if progress:
+            progress(stage, stats)
+    
+    if cost is None:
+        cost = current_app.config['BCRYPT_LOG_ROUNDS']
+    password_hash = _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds=cost)).decode('utf-8')
+    
+    first_permission = _next_id(Permission)
+    for start in range(0, permissions, batch_size):
+        _insert(Permission.__table__, [
+            {'id': permission_id, 'resource_type': f'synthetic_{permission_id // len(ACTIONS)}',
+             'action': ACTIONS[permission_id % len(ACTIONS)], 'created_at': now}
+            for permission_id in range(first_permission + start,
+                                       first_permission + min(permissions, start + batch_size))
+        ])
+        stats['permissions'] = min(permissions, start + batch_size)
+        report('permissions')
+    
+    first_role = _next_id(Role)
+    _insert(Role.__table__, [
+        {'id': first_role + i, 'name': f'synthetic-role-{first_role + i}', 'created_at': now}
+        for i in range(roles)
+    ])
+    stats['roles'] = roles
+    report('roles')
+    
+    rows = []
+    mu = math.log(max(1, perms_per_role))
+    for i in range(roles):
+        count = min(permissions, max(1, int(rng.lognormvariate(mu, 1.0))))
+        for offset in rng.sample(range(permissions), count):
+            rows.append({'role_id': first_role + i, 'permission_id': first_permission + offset})
+        if len(rows) >= batch_size:
+            _insert(role_permissions, rows)
+            stats['role_permissions'] += len(rows)
+            rows = []
+    _insert(role_permissions, rows)
+    stats['role_permissions'] += len(rows)
+    report('role_permissions')
+    
+    first_user = _next_id(User)
+    fanout, fanout_weights = zip(*ROLE_FANOUT)
+    for start in range(0, users, batch_size):
+        batch = range(first_user + start, first_user + min(users, start + batch_size))
+        user_rows, link_rows = [], []
+        
+        for user_id in batch:
+            created_at = now - timedelta(seconds=rng.randrange(3 * 365 * 86400))
+            is_active = rng.random() >= 0.03
+            user_rows.append({
+                'id': user_id,
+                'email': f'user{user_id}@synthetic.test',
+                'password_hash': password_hash,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES),
+                'is_active': is_active,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'deleted_at': None if is_active else created_at + timedelta(days=rng.randrange(1, 365)),
+            })
+            
+            count = min(roles, rng.choices(fanout, fanout_weights)[0])
+            role_offsets = set()
+            while len(role_offsets) < count:
+                role_offsets.add(_skewed(rng, roles, 2.5))
+            link_rows.extend({'user_id': user_id, 'role_id': first_role + offset} for offset in role_offsets)
+        
+        _insert(User.__table__, user_rows)
+        _insert(user_roles, link_rows)
+        stats['users'] += len(user_rows)
+        stats['user_roles'] += len(link_rows)
+        report('users')
+    
+    for start in range(0, sessions if users else 0, batch_size):
+        session_rows = []
+        for _ in range(start, min(sessions, start + batch_size)):
+            created_at = now - timedelta(seconds=rng.randrange(30 * 86400))
+            state = rng.random()
+            # 60% живых, 30% истекших, 10% отозванных
+            if state < 0.6:
+                expires_at = now + timedelta(seconds=rng.randrange(60, 86400))
+            else:
+                expires_at = created_at + timedelta(hours=1)
+            session_rows.append({
+                'user_id': first_user + _skewed(rng, users, 3),
+                # Токены не зависят от seed: иначе повторный запуск с тем же seed упирается в UNIQUE
+                'session_token': create_session_token(),
+                'created_at': created_at,
+                'expires_at': expires_at,
+                'is_active': state < 0.9,
+            })
+        _insert(UserSession.__table__, session_rows)
+        stats['sessions'] += len(session_rows)
+        report('sessions')
+    
+    collection_versions.bump('roles', 'permissions')
+    
+    stats['seconds'] = time.perf_counter() - started
+    return stats
@@ -0,0 +1,41 @@
+"""Админские списки: число SQL-запросов и время ответа на большой базе
+
+Запуск: python -m benchmarks.admin_listings [число пользователей]
+"""
+
+import sys
+
+from app import db
+from benchmarks.common import make_app, seed, make_admin, login, count_queries, measure, report
+
+
+def main(users=100000, iterations=20):
+    # Без кеша ответов: иначе после прогрева считались бы только попадания в кеш
+    app = make_app(RESPONSE_CACHE_SIZE=0)
+    
+    with app.app_context():
+        seed(users=users, roles=200, permissions=2000, perms_per_role=30, roles_per_user=3)
+        make_admin(1)
+        db.session.remove()
+    
+    client = login(app.test_client(), 'user1@bench.local')
+    
+    print(f"ADMIN LISTINGS ({users} users)")
+    urls = (
+        '/api/admin/users',
+        f'/api/admin/users?cursor={users - 200}',
+        '/api/admin/users?role=role7&is_active=true',
+        '/api/admin/roles',
+        '/api/admin/permissions',
+    )
+    for url in urls:
+        client.get(url)
+        with count_queries(app) as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        
+        report(f"GET {url} ({len(statements)} queries)", measure(lambda: client.get(url), iterations))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,35 @@
+"""Задержка логина (p50/p99) при разных значениях BCRYPT_LOG_ROUNDS
+
+Запуск: python -m benchmarks.bcrypt_cost
+"""
+
+from app import db
+from benchmarks.common import make_app, seed, measure, report
+
+
+def run_cost(cost, iterations):
+    app = make_app(BCRYPT_LOG_ROUNDS=cost)
+    
+    with app.app_context():
+        seed(users=10, roles=2, permissions=8, perms_per_role=4, roles_per_user=1)
+        db.session.remove()
+    
+    client = app.test_client()
+    
+    def login():
+        response = client.post('/api/auth/login', json={
+            'email': 'user1@bench.local', 'password': 'bench123'
+        })
+        assert response.status_code == 200
+    
+    report(f"login, cost={cost}", measure(login, iterations))
+
+
+def main(costs=(4, 6, 8, 10, 12)):
+    print("LOGIN LATENCY BY BCRYPT COST")
+    for cost in costs:
+        run_cost(cost, iterations=max(10, 400 >> max(0, cost - 6)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Общие утилиты для бенчмарков"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Thread
+import logging
+import statistics
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from sqlalchemy import event
+from werkzeug.serving import make_server
+
+from config import Config
+from app import create_app, db, bcrypt
+from app.models import User, Role, Permission, user_roles, role_permissions
+
+
+class BenchConfig(Config):
+    TESTING = True
+    BCRYPT_LOG_ROUNDS = 4
+    RATE_LIMIT_ENABLED = False
+
+
+def make_app(**overrides):
+    """Приложение с отдельной временной базой SQLite"""
+    tmpdir = tempfile.mkdtemp(prefix='rbac-bench-')
+    attrs = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmpdir}/bench.db'}
+    attrs.update(overrides)
+    return create_app(type('BenchConfig', (BenchConfig,), attrs))
+
+
+def seed(users=1000, roles=20, permissions=200, perms_per_role=20, roles_per_user=3,
+         password='bench123'):
+    """Заполнение базы пачками INSERT; у всех пользователей один и тот же хеш пароля"""
+    password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+    
+    db.session.execute(db.insert(Permission), [
+        {'id': i + 1, 'resource_type': f'resource{i // 4}', 'action': ('create', 'read', 'update', 'delete')[i % 4]}
+        for i in range(permissions)
+    ])
+    db.session.execute(db.insert(Role), [
+        {'id': i + 1, 'name': f'role{i + 1}'} for i in range(roles)
+    ])
+    db.session.execute(db.insert(role_permissions), [
+        {'role_id': r + 1, 'permission_id': (r * perms_per_role + p) % permissions + 1}
+        for r in range(roles) for p in range(perms_per_role)
+    ])
+    db.session.execute(db.insert(User), [
+        {'id': i + 1, 'email': f'user{i + 1}@bench.local', 'password_hash': password_hash,
+         'first_name': 'Bench', 'last_name': f'User{i + 1}'}
+        for i in range(users)
+    ])
+    db.session.execute(db.insert(user_roles), [
+        {'user_id': u + 1, 'role_id': (u + k) % roles + 1}
+        for u in range(users) for k in range(min(roles_per_user, roles))
+    ])
+    db.session.commit()
+
+
+def make_admin(user_id=1):
+    """Назначает пользователю роль admin (создает ее при необходимости)"""
+    role = Role.query.filter_by(name='admin').first()
+    if role is None:
+        role = Role(name='admin')
+        db.session.add(role)
+        db.session.flush()
+    db.session.execute(db.insert(user_roles), [{'user_id': user_id, 'role_id': role.id}])
+    db.session.commit()
+
+
+def grant(role_name, resource_type, action):
+    """Добавляет роли разрешение (создает разрешение при необходимости)"""
+    role = Role.query.filter_by(name=role_name).one()
+    permission = Permission.query.filter_by(resource_type=resource_type, action=action).first()
+    if permission is None:
+        permission = Permission(resource_type=resource_type, action=action)
+        db.session.add(permission)
+    role.permissions.append(permission)
+    db.session.commit()
+
+
+def login(client, email, password='bench123'):
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200, response.get_json()
+    return client
+
+
+@contextmanager
+def count_queries(app):
+    """Считает SQL-запросы, выполненные внутри блока"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def serve(app):
+    """Поднимает приложение на локальном многопоточном WSGI-сервере"""
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.port}'
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def session_cookie(app, session_token):
+    """Значение cookie Flask-сессии с заданным токеном"""
+    serializer = app.session_interface.get_signing_serializer(app)
+    return f"{app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'session_token': session_token})}"
+
+
+def http_request(url, method='GET', cookie=None, data=None, headers=None):
+    """HTTP-запрос без исключений на 4xx/5xx; возвращает код ответа"""
+    request = urllib.request.Request(url, method=method, data=data, headers=dict(headers or {}))
+    if cookie:
+        request.add_header('Cookie', cookie)
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+def measure_concurrent(fn, iterations, concurrency):
+    """Как measure, но fn вызывается из concurrency потоков одновременно"""
+    def timed(_):
+        t0 = time.perf_counter()
+        fn()
+        return time.perf_counter() - t0
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(iterations)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+def measure(fn, iterations):
+    """Запускает fn iterations раз, возвращает задержки и пропускную способность"""
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+    return summarize(samples, total)
+
+
+def summarize(samples, total):
+    samples = sorted(samples)
+    
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+    
+    return {
+        'count': len(samples),
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'ops_per_sec': len(samples) / total if total else 0.0,
+    }
+
+
+def report(title, stats):
+    print(f"{title:<45} p50={stats['p50_ms']:8.3f}ms p99={stats['p99_ms']:8.3f}ms "
+          f"{stats['ops_per_sec']:10.1f} ops/s")
@@ -0,0 +1,68 @@
+"""Смешанная нагрузка чтение/запись при DB_PROFILE=default и DB_PROFILE=performance
+
+Запуск: python -m benchmarks.db_profile
+"""
+
+from collections import Counter
+from threading import Lock
+import http.cookiejar
+import itertools
+import json
+import urllib.error
+import urllib.request
+
+from app import db
+from benchmarks.common import make_app, seed, serve, measure_concurrent, report
+
+
+def run_profile(profile, users=200, iterations=3000, concurrency=32):
+    app = make_app(DB_PROFILE=profile, SESSION_CACHE_SIZE=0, HASHING_QUEUE_TIMEOUT=30)
+    
+    with app.app_context():
+        seed(users=users, roles=5, permissions=20, perms_per_role=4, roles_per_user=1)
+        db.session.remove()
+    
+    statuses = Counter()
+    lock = Lock()
+    counter = itertools.count()
+    
+    with serve(app) as base_url:
+        def scenario():
+            n = next(counter)
+            jar = http.cookiejar.CookieJar()
+            opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+            
+            def call(method, path, body=None):
+                request = urllib.request.Request(
+                    f'{base_url}{path}', method=method,
+                    data=json.dumps(body).encode() if body is not None else None,
+                    headers={'Content-Type': 'application/json'}
+                )
+                try:
+                    with opener.open(request) as response:
+                        response.read()
+                        code = response.status
+                except urllib.error.HTTPError as error:
+                    code = error.code
+                with lock:
+                    statuses[code] += 1
+            
+            call('POST', '/api/auth/login', {'email': f'user{n % users + 1}@bench.local', 'password': 'bench123'})
+            for _ in range(4):
+                call('GET', '/api/auth/me')
+            call('POST', '/api/auth/logout')
+        
+        stats = measure_concurrent(scenario, iterations // 6, concurrency)
+    
+    report(f"{profile}: login + 4x me + logout", stats)
+    print(f"    statuses: {dict(statuses)}")
+
+
+def main():
+    print("MIXED READ/WRITE WORKLOAD")
+    for profile in ('default', 'performance'):
+        run_profile(profile)
+
+
+if __name__ == '__main__':
+    main()
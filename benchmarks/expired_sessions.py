@@ -0,0 +1,46 @@
+"""Параллельные GET /api/auth/me с истекшими токенами не должны писать в базу
+
+Запуск: python -m benchmarks.expired_sessions
+"""
+
+from datetime import datetime, timedelta
+import itertools
+
+from app import db
+from benchmarks.common import (
+    make_app, seed, serve, session_cookie, http_request, count_queries, measure_concurrent, report
+)
+
+
+def main(tokens=500, iterations=2000, concurrency=32):
+    app = make_app(SESSION_CACHE_SIZE=0)
+    
+    with app.app_context():
+        seed(users=100, roles=5, permissions=20, perms_per_role=4, roles_per_user=1)
+        store = app.extensions['session_store']
+        now = datetime.utcnow()
+        expired = [session_cookie(app, store.create(i % 100 + 1, now - timedelta(minutes=5)))
+                   for i in range(tokens)]
+        valid = [session_cookie(app, store.create(i % 100 + 1, now + timedelta(hours=1)))
+                 for i in range(tokens)]
+        db.session.remove()
+    
+    print(f"GET /api/auth/me, {concurrency} concurrent clients")
+    with serve(app) as base_url:
+        for title, cookies, expected in (('expired tokens', expired, 401), ('valid tokens', valid, 200)):
+            cycle = itertools.cycle(cookies)
+            
+            def call():
+                assert http_request(f'{base_url}/api/auth/me', cookie=next(cycle)) == expected
+            
+            with count_queries(app) as statements:
+                stats = measure_concurrent(call, iterations, concurrency)
+            writes = [s for s in statements if not s.lstrip().upper().startswith('SELECT')]
+            
+            report(f"{title} ({len(writes)} writes)", stats)
+            if expected == 401:
+                assert not writes, writes[:3]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Задержка легитимных логинов во время перебора паролей, с лимитером и без
+
+Атакующие потоки долбят /api/auth/login неверным паролем с одного IP,
+параллельно замеряются логины обычных пользователей с разных адресов.
+
+Запуск: python -m benchmarks.login_throttle
+"""
+
+from threading import Event, Thread
+
+from app import db
+from app.auth import get_auth_stats
+from benchmarks.common import make_app, seed, measure, report
+
+USERS = 200
+ATTACKERS = 8
+
+
+def attack(app, stop, email):
+    client = app.test_client()
+    while not stop.is_set():
+        client.post('/api/auth/login', json={'email': email, 'password': 'wrong-password'},
+                    environ_base={'REMOTE_ADDR': '10.66.0.1'})
+
+
+def run(enabled, cost):
+    app = make_app(BCRYPT_LOG_ROUNDS=cost, RATE_LIMIT_ENABLED=enabled,
+                   RATE_LIMITS='auth.login.ip=30/60,auth.login.email=5/60')
+    
+    with app.app_context():
+        seed(users=USERS + ATTACKERS, roles=2, permissions=8, perms_per_role=4, roles_per_user=1)
+        db.session.remove()
+    
+    client = app.test_client()
+    failures = []
+    counter = iter(range(USERS))
+    
+    def login():
+        n = next(counter) + 1
+        response = client.post('/api/auth/login', json={
+            'email': f'user{n}@bench.local', 'password': 'bench123'
+        }, environ_base={'REMOTE_ADDR': f'10.1.{n // 250}.{n % 250 + 1}'})
+        if response.status_code != 200:
+            failures.append(response.status_code)
+    
+    stop = Event()
+    attackers = [
+        Thread(target=attack, args=(app, stop, f'user{USERS + i + 1}@bench.local'), daemon=True)
+        for i in range(ATTACKERS)
+    ]
+    for thread in attackers:
+        thread.start()
+    
+    try:
+        stats = measure(login, USERS)
+    finally:
+        stop.set()
+        for thread in attackers:
+            thread.join()
+    
+    title = f"login under attack, limiter {'on' if enabled else 'off'}"
+    report(title, stats)
+    print(f"{'':<45} failed={len(failures)}/{USERS} rate_limit={get_auth_stats()['rate_limit']}")
+
+
+def main(cost=8):
+    print(f"LEGITIMATE LOGIN LATENCY DURING BRUTE FORCE (cost={cost}, attackers={ATTACKERS})")
+    run(False, cost)
+    run(True, cost)
+
+
+if __name__ == '__main__':
+    main()
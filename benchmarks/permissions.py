@@ -0,0 +1,54 @@
+"""Сравнение проверки прав: обход ORM-связей против скомпилированного индекса
+
+Запуск: python -m benchmarks.permissions
+"""
+
+import random
+
+from app import db
+from app.models import User
+from app.permissions import permission_index
+from benchmarks.common import make_app, seed, measure, report
+
+
+def orm_has_permission(user, resource_type, action):
+    for role in user.roles:
+        if role.has_permission(resource_type, action):
+            return True
+    return False
+
+
+def main(users=2000, iterations=2000):
+    app = make_app()
+    rng = random.Random(42)
+    
+    with app.app_context():
+        seed(users=users, roles=50, permissions=400, perms_per_role=40, roles_per_user=3)
+        
+        def pick():
+            return rng.randint(1, users), f'resource{rng.randint(0, 99)}', rng.choice(['read', 'update'])
+        
+        def orm_check():
+            user_id, resource_type, action = pick()
+            db.session.expire_all()
+            user = db.session.get(User, user_id)
+            orm_has_permission(user, resource_type, action)
+        
+        def index_check():
+            user_id, resource_type, action = pick()
+            permission_index.user_has_permission(user_id, resource_type, action)
+        
+        for user_id in range(1, 50):
+            for resource in range(100):
+                assert orm_has_permission(db.session.get(User, user_id), f'resource{resource}', 'read') == \
+                    permission_index.user_has_permission(user_id, f'resource{resource}', 'read')
+        
+        print("PERMISSION CHECK")
+        report("ORM traversal (roles x permissions)", measure(orm_check, iterations))
+        permission_index.rebuild()
+        report("Permission index (cold users)", measure(index_check, iterations))
+        report("Permission index (warm users)", measure(index_check, iterations))
+
+
+if __name__ == '__main__':
+    main()
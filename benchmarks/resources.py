@@ -0,0 +1,71 @@
+"""Операции над одной статьей при миллионе записей в таблице
+
+Запуск: python -m benchmarks.resources [число статей]
+"""
+
+import random
+import sys
+
+from app import db
+from app.models import Article
+from benchmarks.common import make_app, seed, make_admin, grant, login, measure, report
+
+
+def seed_articles(count, chunk=50000):
+    for start in range(0, count, chunk):
+        db.session.execute(db.insert(Article), [
+            {'title': f'Статья {i}', 'content': 'Текст статьи ' * 20, 'author': f'author{i % 1000}'}
+            for i in range(start, min(count, start + chunk))
+        ])
+    db.session.commit()
+
+
+def main(count=1000000, iterations=1000):
+    app = make_app()
+    rng = random.Random(7)
+    
+    with app.app_context():
+        seed(users=10, roles=2, permissions=8, perms_per_role=4, roles_per_user=1)
+        make_admin(1)
+        for action in ('create', 'read', 'update', 'delete'):
+            grant('admin', 'articles', action)
+        seed_articles(count)
+        db.session.remove()
+    
+    client = login(app.test_client(), 'user1@bench.local')
+    deleted = set()
+    
+    def get_one():
+        assert client.get(f'/api/resources/articles/{rng.randint(1, count)}').status_code in (200, 404)
+    
+    def update_one():
+        response = client.put(f'/api/resources/articles/{rng.randint(1, count)}', json={'title': 'Новый заголовок'})
+        assert response.status_code in (200, 404)
+    
+    def create_one():
+        assert client.post('/api/resources/articles', json={'title': 'Новая', 'content': '...'}).status_code == 201
+    
+    def delete_one():
+        article_id = rng.randint(1, count)
+        while article_id in deleted:
+            article_id = rng.randint(1, count)
+        deleted.add(article_id)
+        assert client.delete(f'/api/resources/articles/{article_id}').status_code == 200
+    
+    print(f"ARTICLES ({count} rows)")
+    report("GET /articles/<id>", measure(get_one, iterations))
+    report("PUT /articles/<id>", measure(update_one, iterations))
+    report("POST /articles", measure(create_one, iterations))
+    report("DELETE /articles/<id>", measure(delete_one, iterations))
+    
+    mock = [{'id': i + 1, 'title': f'Статья {i}'} for i in range(count)]
+    
+    def scan_one():
+        article_id = rng.randint(1, count)
+        next(a for a in mock if a['id'] == article_id)
+    
+    report("reference: linear scan of a Python list", measure(scan_one, 20))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
@@ -0,0 +1,38 @@
+"""GET-списки с кешем сериализованных ответов и без него
+
+Запуск: python -m benchmarks.response_cache
+"""
+
+from app import db
+from benchmarks.common import make_app, seed, make_admin, grant, login, measure, report
+
+
+def run(cache_size, iterations):
+    app = make_app(RESPONSE_CACHE_SIZE=cache_size)
+    
+    with app.app_context():
+        seed(users=10, roles=50, permissions=400, perms_per_role=40, roles_per_user=1)
+        make_admin(1)
+        grant('admin', 'articles', 'read')
+        db.session.remove()
+    
+    client = login(app.test_client(), 'user1@bench.local')
+    label = 'cached' if cache_size else 'uncached'
+    
+    for url in ('/api/resources/articles', '/api/admin/roles', '/api/admin/permissions'):
+        def call():
+            response = client.get(url)
+            assert response.status_code == 200
+        
+        call()
+        report(f"{label}: GET {url}", measure(call, iterations))
+
+
+def main(iterations=1000):
+    print("RESPONSE CACHE")
+    run(0, iterations)
+    run(1024, iterations)
+
+
+if __name__ == '__main__':
+    main()
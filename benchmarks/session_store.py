@@ -0,0 +1,46 @@
+"""Пропускная способность логина и проверки сессии для каждого бэкенда хранилища сессий
+
+Запуск: python -m benchmarks.session_store
+"""
+
+import os
+import tempfile
+
+from app import db
+from benchmarks.common import make_app, seed, measure, report
+
+
+def run_backend(backend, users=200, iterations=500):
+    store_path = os.path.join(tempfile.mkdtemp(prefix='rbac-sessions-'), 'sessions.db')
+    app = make_app(SESSION_STORE=backend, SESSION_STORE_PATH=store_path, SESSION_CACHE_SIZE=0)
+    
+    with app.app_context():
+        seed(users=users, roles=5, permissions=20, perms_per_role=4, roles_per_user=1)
+        db.session.remove()
+    
+    client = app.test_client()
+    counter = iter(range(10 ** 9))
+    
+    def login():
+        user_id = next(counter) % users + 1
+        response = client.post('/api/auth/login', json={
+            'email': f'user{user_id}@bench.local', 'password': 'bench123'
+        })
+        assert response.status_code == 200, response.get_json()
+    
+    def auth_check():
+        response = client.get('/api/auth/me')
+        assert response.status_code == 200
+    
+    report(f"{backend}: login", measure(login, iterations))
+    report(f"{backend}: GET /api/auth/me", measure(auth_check, iterations))
+
+
+def main():
+    print("SESSION STORE BACKENDS (session cache disabled)")
+    for backend in ('sqlalchemy', 'memory', 'file'):
+        run_backend(backend)
+
+
+if __name__ == '__main__':
+    main()
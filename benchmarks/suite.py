@@ -0,0 +1,363 @@
+"""Нагрузочный прогон основных сценариев API с сохранением результатов в JSON
+
+Заполняет временную базу (пользователи с ролями admin/manager/editor/user,
+разрешения на articles/documents/reports, ресурсы и сессии) и гоняет сценарии
+через Flask test client и/или через локальный WSGI-сервер. Для каждого сценария
+считаются p50/p95/p99, запросы в секунду и SQL-запросы на один HTTP-запрос.
+
+Запуск:
+    python -m benchmarks.suite --users 10000 --concurrency 8 -o results.json
+    python -m benchmarks.suite --compare results.json   # сравнить с прошлым прогоном
+"""
+
+from datetime import datetime, timedelta
+from itertools import count
+from threading import local
+import argparse
+import json
+import platform
+import random
+import secrets
+import subprocess
+import sys
+
+from app import db, bcrypt
+from app.models import User, Role, Permission, UserSession, Article, Document, Report, user_roles, role_permissions
+from app.session_store import get_session_store
+from benchmarks.common import make_app, serve, session_cookie, http_request, count_queries, measure_concurrent
+
+PASSWORD = 'bench123'
+RESOURCES = ('articles', 'documents', 'reports')
+ACTIONS = ('create', 'read', 'update', 'delete')
+
+# Роли как в init-db; доля - часть пользователей с этой ролью
+ROLES = {
+    'admin': (0.02, [(resource, action) for resource in RESOURCES for action in ACTIONS]),
+    'manager': (0.08, [('articles', 'read'), ('documents', 'read'),
+                       ('reports', 'create'), ('reports', 'read'), ('reports', 'update')]),
+    'editor': (0.20, [(resource, action) for resource in ('articles', 'documents')
+                      for action in ('create', 'read', 'update')]),
+    'user': (0.70, [('articles', 'read'), ('documents', 'read')]),
+}
+
+SCENARIOS = (
+    'login', 'auth_me',
+    'resources_admin', 'resources_manager', 'resources_editor', 'resources_user',
+    'admin_users', 'admin_roles', 'admin_permissions', 'role_mutation',
+)
+
+
+def seed_suite(users, sessions, resources, rng):
+    """Заполнение базы пачками INSERT; возвращает id пользователей по ролям"""
+    password_hash = bcrypt.generate_password_hash(PASSWORD).decode('utf-8')
+    
+    permission_ids = {}
+    for resource in RESOURCES:
+        for action in ACTIONS:
+            permission_ids[resource, action] = len(permission_ids) + 1
+    db.session.execute(db.insert(Permission), [
+        {'id': permission_id, 'resource_type': resource, 'action': action}
+        for (resource, action), permission_id in permission_ids.items()
+    ])
+    
+    role_ids = {name: i + 1 for i, name in enumerate(ROLES)}
+    db.session.execute(db.insert(Role), [{'id': role_id, 'name': name} for name, role_id in role_ids.items()])
+    db.session.execute(db.insert(role_permissions), [
+        {'role_id': role_ids[name], 'permission_id': permission_ids[pair]}
+        for name, (_, pairs) in ROLES.items() for pair in pairs
+    ])
+    
+    names = list(ROLES)
+    weights = [share for share, _ in ROLES.values()]
+    users_by_role = {name: [] for name in ROLES}
+    
+    for start in range(0, users, 10000):
+        batch = range(start + 1, min(users, start + 10000) + 1)
+        db.session.execute(db.insert(User), [
+            {'id': user_id, 'email': f'user{user_id}@bench.local', 'password_hash': password_hash,
+             'first_name': 'Bench', 'last_name': f'User{user_id}'}
+            for user_id in batch
+        ])
+        links = []
+        for user_id in batch:
+            name = names[0] if user_id == 1 else rng.choices(names, weights)[0]
+            users_by_role[name].append(user_id)
+            links.append({'user_id': user_id, 'role_id': role_ids[name]})
+        db.session.execute(db.insert(user_roles), links)
+    
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    for start in range(0, sessions, 10000):
+        db.session.execute(db.insert(UserSession), [
+            {'user_id': rng.randint(1, users), 'session_token': secrets.token_urlsafe(32),
+             'expires_at': expires_at, 'is_active': True}
+            for _ in range(start, min(sessions, start + 10000))
+        ])
+    
+    extra_columns = {
+        Article: {'content': 'Текст статьи ' * 20, 'author': 'bench'},
+        Document: {'type': 'PDF', 'size': '1.2 MB'},
+        Report: {'date': datetime.utcnow().date(), 'status': 'completed'},
+    }
+    for model, extra in extra_columns.items():
+        db.session.execute(db.insert(model), [
+            {'title': f'{model.__tablename__} {i}', **extra} for i in range(resources)
+        ])
+    
+    db.session.commit()
+    return users_by_role, permission_ids
+
+
+class ClientDriver:
+    """Запросы через Flask test client, без сети"""
+    name = 'client'
+    
+    def __init__(self, app):
+        self.app = app
+        self._client = app.test_client(use_cookies=False)
+    
+    def request(self, method, path, cookie=None, body=None):
+        headers = {'Cookie': cookie} if cookie else {}
+        return self._client.open(path, method=method, json=body, headers=headers).status_code
+
+
+class HttpDriver:
+    """Запросы по HTTP к локальному многопоточному WSGI-серверу"""
+    name = 'http'
+    
+    def __init__(self, app, base_url):
+        self.app = app
+        self.base_url = base_url
+    
+    def request(self, method, path, cookie=None, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        return http_request(self.base_url + path, method=method, cookie=cookie, data=data, headers=headers)
+
+
+class Scenarios:
+    def __init__(self, app, users_by_role, permission_ids, rng, scratch_roles=64, tokens_per_role=200):
+        self.rng = rng
+        self.users_by_role = users_by_role
+        self.permission_ids = list(permission_ids.values())
+        self.readable = {
+            name: sorted({resource for resource, action in pairs if action == 'read'})
+            for name, (_, pairs) in ROLES.items()
+        }
+        
+        expires_at = datetime.utcnow() + timedelta(days=1)
+        with app.app_context():
+            store = get_session_store()
+            self.cookies = {
+                name: [
+                    session_cookie(app, store.create(user_id, expires_at))
+                    for user_id in rng.sample(user_ids, min(tokens_per_role, len(user_ids)))
+                ]
+                for name, user_ids in users_by_role.items() if user_ids
+            }
+            
+            scratch = [Role(name=f'bench-scratch-{i}') for i in range(scratch_roles)]
+            db.session.add_all(scratch)
+            db.session.commit()
+            self._scratch_roles = [role.id for role in scratch]
+            db.session.remove()
+        
+        self._local = local()
+        self._threads = count()
+    
+    def cookie(self, role=None):
+        if role is None:
+            role = self.rng.choice(list(self.cookies))
+        return self.rng.choice(self.cookies[role])
+    
+    def build(self, name, driver):
+        """Функция одного запроса сценария и число HTTP-запросов в ней"""
+        if name == 'login':
+            def run():
+                user_id = self.rng.choice(self.users_by_role[self.rng.choice(list(self.cookies))])
+                return [driver.request('POST', '/api/auth/login', body={
+                    'email': f'user{user_id}@bench.local', 'password': PASSWORD
+                })]
+            return run, 1
+        
+        if name == 'auth_me':
+            return lambda: [driver.request('GET', '/api/auth/me', cookie=self.cookie())], 1
+        
+        if name.startswith('resources_'):
+            role = name.split('_', 1)[1]
+            
+            def run():
+                resource = self.rng.choice(self.readable[role])
+                return [driver.request('GET', f'/api/resources/{resource}?limit=20', cookie=self.cookie(role))]
+            return run, 1
+        
+        if name.startswith('admin_'):
+            path = {
+                'admin_users': '/api/admin/users?limit=100',
+                'admin_roles': '/api/admin/roles',
+                'admin_permissions': '/api/admin/permissions',
+            }[name]
+            return lambda: [driver.request('GET', path, cookie=self.cookie('admin'))], 1
+        
+        if name == 'role_mutation':
+            def run():
+                role_id = getattr(self._local, 'role_id', None)
+                if role_id is None:
+                    role_id = self._scratch_roles[next(self._threads) % len(self._scratch_roles)]
+                    self._local.role_id = role_id
+                permission_id = self.rng.choice(self.permission_ids)
+                cookie = self.cookie('admin')
+                return [
+                    driver.request('POST', f'/api/admin/roles/{role_id}/permissions', cookie=cookie,
+                                   body={'permission_id': permission_id}),
+                    driver.request('DELETE', f'/api/admin/roles/{role_id}/permissions/{permission_id}',
+                                   cookie=cookie),
+                ]
+            return run, 2
+        
+        raise ValueError(f'Unknown scenario: {name}')
+
+
+def run_scenario(app, scenarios, driver, name, iterations, concurrency):
+    run, requests_per_op = scenarios.build(name, driver)
+    errors = []
+    
+    def op():
+        errors.extend(status for status in run() if status >= 400)
+    
+    for _ in range(min(10, iterations)):
+        op()
+    errors.clear()
+    
+    with count_queries(app) as statements:
+        stats = measure_concurrent(op, iterations, concurrency)
+    
+    stats['requests_per_sec'] = stats['ops_per_sec'] * requests_per_op
+    stats['queries_per_request'] = len(statements) / (iterations * requests_per_op)
+    stats['errors'] = len(errors)
+    return stats
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Печатает разницу с прошлым прогоном; возвращает список регрессий"""
+    regressions = []
+    print(f"\nCOMPARISON WITH BASELINE ({baseline['meta'].get('revision')}, threshold {threshold:.0%})")
+    
+    for mode, scenarios in results['results'].items():
+        for name, stats in scenarios.items():
+            base = baseline['results'].get(mode, {}).get(name)
+            if base is None:
+                continue
+            
+            p95 = stats['p95_ms'] / base['p95_ms'] - 1 if base['p95_ms'] else 0.0
+            rps = stats['requests_per_sec'] / base['requests_per_sec'] - 1 if base['requests_per_sec'] else 0.0
+            queries = stats['queries_per_request'] - base['queries_per_request']
+            
+            flags = []
+            if p95 > threshold:
+                flags.append('p95')
+            if rps < -threshold:
+                flags.append('req/s')
+            if queries > 0.5:
+                flags.append('queries')
+            if flags:
+                regressions.append((mode, name, flags))
+            
+            print(f"{mode:<6} {name:<20} p95 {p95:+7.1%}  req/s {rps:+7.1%}  queries/req {queries:+6.2f}"
+                  f"{'  REGRESSION: ' + ', '.join(flags) if flags else ''}")
+    
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--sessions', type=int, default=None, help='строк в user_sessions (по умолчанию = users)')
+    parser.add_argument('--resources', type=int, default=1000, help='записей в каждой таблице ресурсов')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mode', choices=('client', 'http', 'both'), default='both')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--session-store', default='sqlalchemy')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('-o', '--output', help='куда записать результаты в JSON')
+    parser.add_argument('--compare', help='JSON прошлого прогона для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.2, help='допустимое ухудшение p95 и req/s')
+    args = parser.parse_args(argv)
+    
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    
+    rng = random.Random(args.seed)
+    app = make_app(SESSION_STORE=args.session_store)
+    
+    with app.app_context():
+        users_by_role, permission_ids = seed_suite(
+            args.users, args.users if args.sessions is None else args.sessions, args.resources, rng
+        )
+        db.session.remove()
+    
+    scenarios = Scenarios(app, users_by_role, permission_ids, rng, scratch_roles=4 * args.concurrency + 1)
+    skipped = [name for name in names if name.startswith('resources_') and not users_by_role[name.split('_', 1)[1]]]
+    names = [name for name in names if name not in skipped]
+    if skipped:
+        print(f"Skipped (no users with this role): {', '.join(skipped)}")
+    modes = ('client', 'http') if args.mode == 'both' else (args.mode,)
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'started_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'users': args.users,
+            'iterations': args.iterations,
+            'concurrency': args.concurrency,
+            'session_store': args.session_store,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+    
+    print(f"SUITE users={args.users} iterations={args.iterations} concurrency={args.concurrency}")
+    for mode in modes:
+        results['results'][mode] = {}
+        
+        def run_all(driver):
+            for name in names:
+                stats = run_scenario(app, scenarios, driver, name, args.iterations, args.concurrency)
+                results['results'][mode][name] = stats
+                print(f"{mode:<6} {name:<20} p50={stats['p50_ms']:8.3f}ms p95={stats['p95_ms']:8.3f}ms "
+                      f"p99={stats['p99_ms']:8.3f}ms {stats['requests_per_sec']:9.1f} req/s "
+                      f"{stats['queries_per_request']:6.2f} q/req errors={stats['errors']}")
+        
+        if mode == 'http':
+            with serve(app) as base_url:
+                run_all(HttpDriver(app, base_url))
+        else:
+            run_all(ClientDriver(app))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\nResults written to {args.output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
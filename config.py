@@ -11,6 +11,63 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URI', f'sqlite:///{BASE_DIR}/DB/auth_system.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Реплика только для чтения: авторизация и GET-списки админки; пусто - все идет в основную базу
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URI')
+    REPLICA_READ_YOUR_WRITES_WINDOW = int(os.getenv('REPLICA_READ_YOUR_WRITES_WINDOW', 5))
+    # performance - WAL, synchronous=NORMAL, busy_timeout и размеры пула; default - настройки драйвера как есть
+    DB_PROFILE = os.getenv('DB_PROFILE', 'performance')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 65536))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Lax'
     PERMANENT_SESSION_LIFETIME = 3600
+    
+    PERMISSION_INDEX_TTL = int(os.getenv('PERMISSION_INDEX_TTL', 60))
+    PERMISSION_INDEX_MAX_USERS = int(os.getenv('PERMISSION_INDEX_MAX_USERS', 100000))
+    
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 10000))
+    SESSION_CACHE_TTL = int(os.getenv('SESSION_CACHE_TTL', 30))
+    
+    # Email-ы, для которых логин заведомо не пройдет (нет такого пользователя или аккаунт деактивирован)
+    NEGATIVE_LOGIN_CACHE_SIZE = int(os.getenv('NEGATIVE_LOGIN_CACHE_SIZE', 50000))
+    NEGATIVE_LOGIN_CACHE_TTL = int(os.getenv('NEGATIVE_LOGIN_CACHE_TTL', 60))
+    
+    # sqlalchemy | memory | file | signed
+    SESSION_STORE = os.getenv('SESSION_STORE', 'sqlalchemy')
+    SESSION_STORE_PATH = os.getenv('SESSION_STORE_PATH', f'{BASE_DIR}/DB/sessions.db')
+    SESSION_EPOCH_TTL = int(os.getenv('SESSION_EPOCH_TTL', 5))
+    
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # None - по числу ядер, 0 - хешировать прямо в потоке запроса
+    HASHING_WORKERS = int(os.getenv('HASHING_WORKERS')) if os.getenv('HASHING_WORKERS') else None
+    HASHING_QUEUE_SIZE = int(os.getenv('HASHING_QUEUE_SIZE', 32))
+    HASHING_QUEUE_TIMEOUT = float(os.getenv('HASHING_QUEUE_TIMEOUT', 0.5))
+    HASHING_RETRY_AFTER = int(os.getenv('HASHING_RETRY_AFTER', 1))
+    IMPORT_HASH_WORKERS = int(os.getenv('IMPORT_HASH_WORKERS')) if os.getenv('IMPORT_HASH_WORKERS') else None
+    
+    # 0 - фоновая очистка выключена, сессии чистятся командой flask reap-sessions
+    SESSION_REAPER_INTERVAL = int(os.getenv('SESSION_REAPER_INTERVAL', 0))
+    SESSION_REAPER_BATCH_SIZE = int(os.getenv('SESSION_REAPER_BATCH_SIZE', 1000))
+    
+    # Лимиты вида <blueprint>[.<endpoint>].<ip|email>=<запросов>/<секунд>, считаются до обращения к базе и bcrypt
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMITS = os.getenv(
+        'RATE_LIMITS',
+        'auth.login.ip=30/60,auth.login.email=5/60,auth.register.ip=30/60,user.change_password.ip=10/60'
+    )
+    # memory - счетчики в процессе; file - общий sqlite-файл для нескольких воркеров
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_PATH = os.getenv('RATE_LIMIT_PATH', f'{BASE_DIR}/DB/rate_limits.db')
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+    
+    # Server-Timing в ответах и гистограммы в формате Prometheus на /metrics (доступен только с localhost)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'true').lower() == 'true'
+    METRICS_ALLOW_REMOTE = os.getenv('METRICS_ALLOW_REMOTE', 'false').lower() == 'true'
+    
+    COLLECTION_VERSION_TTL = int(os.getenv('COLLECTION_VERSION_TTL', 2))
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
@@ -1,10 +1,49 @@
+import click
+from datetime import date
+
 from app import create_app, db
-from app.models import User, Role, Permission
+from app.models import User, Role, Permission, Article, Document, Report
 from app.auth import hash_password
+from app.bulk_import import import_users as run_user_import, parse_records, detect_format
+from app.export import iter_export_lines, iter_gzip
+from app.hashing import calibrate_cost
+from app.reaper import reap_sessions as run_session_reaper
+from app.synthetic import generate as generate_synthetic_data
 
 app = create_app()
 
 
+def seed_resources():
+    created = []
+    
+    if not db.session.query(Article.id).first():
+        db.session.add_all([
+            Article(title='Введение в Python', content='Python - это высокоуровневый язык программирования...', author='Иван Иванов'),
+            Article(title='Основы Flask', content='Flask - микрофреймворк для веб-разработки...', author='Петр Петров'),
+            Article(title='SQLAlchemy ORM', content='SQLAlchemy - это SQL toolkit и ORM для Python...', author='Сидор Сидоров'),
+        ])
+        created.append('3 статьи')
+    
+    if not db.session.query(Document.id).first():
+        db.session.add_all([
+            Document(title='Спецификация проекта', type='PDF', size='2.4 MB'),
+            Document(title='Техническое задание', type='DOCX', size='1.8 MB'),
+            Document(title='Договор поставки', type='PDF', size='0.5 MB'),
+        ])
+        created.append('3 документа')
+    
+    if not db.session.query(Report.id).first():
+        db.session.add_all([
+            Report(title='Финансовый отчет Q1 2026', date=date(2026, 3, 31), status='completed'),
+            Report(title='Отчет по продажам', date=date(2026, 2, 1), status='in_progress'),
+            Report(title='Аналитический отчет', date=date(2026, 1, 15), status='completed'),
+        ])
+        created.append('3 отчета')
+    
+    db.session.commit()
+    return created
+
+
 @app.cli.command()
 def init_db():
     with app.app_context():
@@ -145,8 +184,117 @@ def init_db():
         print("3. editor@example.com / editor123 (роль: editor)")
         print("4. manager@example.com / manager123 (роль: manager)")
         print("5. multirole@example.com / multi123 (роли: editor, manager)")
+        
+        print(f"\nСозданы ресурсы: {', '.join(seed_resources())}")
         print("\nИнициализация завершена!")
 
 
+@app.cli.command('seed-resources')
+def seed_resources_command():
+    with app.app_context():
+        db.create_all()
+        created = seed_resources()
+    
+    if created:
+        print(f"Созданы ресурсы: {', '.join(created)}")
+    else:
+        print("Таблицы ресурсов уже заполнены")
+
+
+@app.cli.command()
+@click.option('--target-ms', default=250, show_default=True, help='Допустимое время одного хеширования')
+@click.option('--max-cost', default=16, show_default=True)
+def calibrate_bcrypt(target_ms, max_cost):
+    cost, timings = calibrate_cost(target_ms / 1000, max_cost=max_cost)
+    
+    for rounds, seconds in timings.items():
+        print(f"cost={rounds:2d}: {seconds * 1000:8.1f} ms")
+    
+    print(f"\nРекомендуемое значение для целевых {target_ms} мс: BCRYPT_LOG_ROUNDS={cost}")
+    print(f"Текущее значение: BCRYPT_LOG_ROUNDS={app.config['BCRYPT_LOG_ROUNDS']}")
+    print("Существующие хеши будут перехешированы при следующем входе пользователя")
+
+
+@app.cli.command()
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default='-', show_default=True)
+@click.option('--gzip', 'use_gzip', is_flag=True, help='Сжать вывод gzip')
+@click.option('--batch-size', default=1000, show_default=True)
+def export_data(output, use_gzip, batch_size):
+    lines = iter_export_lines(batch_size=batch_size)
+    chunks = iter_gzip(lines) if use_gzip else (line.encode('utf-8') for line in lines)
+    
+    with click.open_file(output, 'wb') as stream:
+        for chunk in chunks:
+            stream.write(chunk)
+
+
+@app.cli.command()
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'ndjson']), help='По умолчанию - по расширению файла')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--workers', type=int, help='Процессов для хеширования (по умолчанию - по числу ядер)')
+@click.option('--default-role', default='user', show_default=True)
+def import_users(path, fmt, batch_size, workers, default_role):
+    def progress(stats):
+        print(f"  пачка {stats['batches']}: импортировано {stats['imported']}")
+    
+    with open(path, encoding='utf-8', newline='') as stream:
+        stats = run_user_import(
+            parse_records(stream, fmt or detect_format(path)),
+            cost=app.config['BCRYPT_LOG_ROUNDS'],
+            batch_size=batch_size,
+            workers=workers,
+            default_role=default_role,
+            progress=progress
+        )
+    
+    print(f"\nИмпортировано: {stats['imported']}")
+    print(f"Пропущено (уже существуют): {stats['skipped_existing']}")
+    print(f"Пропущено (некорректные): {stats['skipped_invalid']}")
+    print(f"Время: {stats['seconds']:.1f} с ({stats['users_per_second']:.0f} пользователей/с)")
+
+
+@app.cli.command()
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--max-batches', type=int, help='Ограничить число пачек за один запуск')
+def reap_sessions(batch_size, max_batches):
+    stats = run_session_reaper(batch_size=batch_size, max_batches=max_batches)
+    print(f"Удалено сессий: {stats['deleted']} ({stats['batches']} пачек, {stats['seconds']:.2f} с)")
+
+
+@app.cli.command()
+@click.option('--users', default=1000000, show_default=True)
+@click.option('--roles', default=2000, show_default=True)
+@click.option('--permissions', default=20000, show_default=True)
+@click.option('--sessions', default=2000000, show_default=True)
+@click.option('--perms-per-role', default=30, show_default=True, help='Медиана числа разрешений у роли')
+@click.option('--password', default='password123', show_default=True, help='Один пароль на всех пользователей')
+@click.option('--cost', type=int, help='Стоимость bcrypt для общего хеша, по умолчанию BCRYPT_LOG_ROUNDS')
+@click.option('--seed', default=42, show_default=True)
+@click.option('--batch-size', default=10000, show_default=True)
+def generate_data(users, roles, permissions, sessions, perms_per_role, password, cost, seed, batch_size):
+    def progress(stage, stats):
+        print(f"  {stage}: {stats[stage]}")
+    
+    stats = generate_synthetic_data(
+        users=users,
+        roles=roles,
+        permissions=permissions,
+        sessions=sessions,
+        perms_per_role=perms_per_role,
+        password=password,
+        cost=cost,
+        seed=seed,
+        batch_size=batch_size,
+        progress=progress
+    )
+    
+    print(f"\nПользователей: {stats['users']} (связей с ролями: {stats['user_roles']})")
+    print(f"Ролей: {stats['roles']} (связей с разрешениями: {stats['role_permissions']})")
+    print(f"Разрешений: {stats['permissions']}")
+    print(f"Сессий: {stats['sessions']}")
+    print(f"Время: {stats['seconds']:.1f} с")
+
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,48 @@
+"""Число SQL-запросов в админских списках не зависит от числа строк
+
+Запуск: python -m pytest tests
+"""
+
+import pytest
+
+from app import db
+from benchmarks.common import make_app, seed, make_admin, login, count_queries
+
+MAX_LISTING_QUERIES = 4
+
+# Больше 500 строк на странице: столько selectinload загружает одной пачкой,
+# поэтому откат на него или на ленивую загрузку увеличит число запросов
+USERS = 1200
+ROLES = 600
+
+URLS = (
+    '/api/admin/users?limit=1000',
+    f'/api/admin/users?limit=1000&cursor={USERS - 1000}',
+    '/api/admin/users?role=role7&is_active=true',
+    '/api/admin/roles',
+    '/api/admin/permissions',
+)
+
+
+@pytest.fixture(scope='module')
+def admin_client():
+    app = make_app(RESPONSE_CACHE_SIZE=0)
+    
+    with app.app_context():
+        seed(users=USERS, roles=ROLES, permissions=200, perms_per_role=5, roles_per_user=2)
+        make_admin(1)
+        db.session.remove()
+    
+    return app, login(app.test_client(), 'user1@bench.local')
+
+
+@pytest.mark.parametrize('url', URLS)
+def test_listing_query_count(admin_client, url):
+    app, client = admin_client
+    client.get(url)
+    
+    with count_queries(app) as statements:
+        response = client.get(url)
+    
+    assert response.status_code == 200
+    assert len(statements) <= MAX_LISTING_QUERIES, f'{url}: {len(statements)} queries'